@@ -0,0 +1,117 @@
+"""Compact in-memory price series and the process-wide cache that holds them.
+
+A yfinance history frame carries float64 columns, a tz-aware index and
+Dividends/Stock Splits columns that are zero for nearly every ticker. Cached
+series keep only int64 epoch seconds, float32 OHLC, integer volume and the
+action columns that actually have values: 5 years of daily bars take ~40 KB
+instead of ~80 KB, and every Streamlit session shares one copy.
+
+SeriesCache bounds the total with an LRU byte budget (PRICE_MEMORY_MB).
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MEMORY_BUDGET = int(os.environ.get("PRICE_MEMORY_MB", 256)) * 1024 * 1024
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+FLOAT_COLUMNS = ["Open", "High", "Low", "Close"]
+ACTION_COLUMNS = ["Dividends", "Stock Splits"]
+
+
+class CompactSeries:
+    __slots__ = ("ts", "tz", "columns", "fetched_at")
+
+    def __init__(self, ts, columns, tz="UTC", fetched_at=None):
+        self.ts = ts
+        self.columns = columns
+        self.tz = tz
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def from_rows(cls, rows, tz="UTC", fetched_at=None):
+        """Build from (ts, open, high, low, close, volume, dividends, splits) rows, as stored in SQLite."""
+        data = np.array(rows, dtype=np.float64).reshape(-1, 1 + len(PRICE_COLUMNS))
+        columns = {name: data[:, 1 + i].astype(np.float32) for i, name in enumerate(FLOAT_COLUMNS)}
+        columns["Volume"] = np.nan_to_num(data[:, 5]).astype(np.int64)
+        for i, name in enumerate(ACTION_COLUMNS):
+            values = np.nan_to_num(data[:, 6 + i])
+            if values.any():
+                columns[name] = values.astype(np.float32)
+        return cls(data[:, 0].astype(np.int64), columns, tz, fetched_at)
+
+    def __len__(self):
+        return len(self.ts)
+
+    @property
+    def nbytes(self):
+        return self.ts.nbytes + sum(values.nbytes for values in self.columns.values())
+
+    @property
+    def last_ts(self):
+        return int(self.ts[-1]) if len(self.ts) else None
+
+    def to_frame(self, start=0):
+        """The yfinance-shaped frame (float64 columns, tz-aware "Date" index) from bar ``start`` on."""
+        index = pd.to_datetime(self.ts[start:], unit="s", utc=True).tz_convert(self.tz or "UTC").rename("Date")
+        data = {}
+        for name in PRICE_COLUMNS:
+            values = self.columns.get(name)
+            data[name] = values[start:].astype(np.float64) if values is not None else np.zeros(len(index))
+        return pd.DataFrame(data, index=index)
+
+
+class SeriesCache:
+    """LRU map of key -> CompactSeries, evicting least recently used entries past ``budget`` bytes."""
+
+    def __init__(self, budget=MEMORY_BUDGET):
+        self.budget = budget
+        self.nbytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            series = self._entries.get(key)
+            if series is not None:
+                self._entries.move_to_end(key)
+            return series
+
+    def put(self, key, series):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+            self._entries[key] = series
+            self.nbytes += series.nbytes
+            while self.nbytes > self.budget and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            series = self._entries.pop(key, None)
+            if series is not None:
+                self.nbytes -= series.nbytes
+            return series
+
+    def stats(self):
+        with self._lock:
+            return {"series": len(self._entries), "bytes": self.nbytes, "budget": self.budget, "evictions": self.evictions}
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_series_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SeriesCache()
+        return _default_cache
@@ -0,0 +1,167 @@
+"""Versioned schema migrations for the dashboard database.
+
+Run from the command line against the database behind DB_PATH:
+
+    python db_migrations.py "/path/to/nycprocurement.db"
+
+The schema version is kept in PRAGMA user_version; only migrations newer
+than the stored version are applied. The representative lookups are run
+through EXPLAIN QUERY PLAN before and after so full table scans show up
+in the report.
+"""
+import argparse
+import sqlite3
+
+
+def normalize_sector(name):
+    # Must match lower(trim(Sector)) used by the triggers below, which is NULL for a NULL Sector
+    if name is None:
+        return None
+    return str(name).strip(" ").lower()
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def _add_sector_key(conn, table):
+    if "Sector_Key" not in _columns(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN Sector_Key TEXT")
+    conn.execute(f"UPDATE {table} SET Sector_Key = lower(trim(Sector))")
+    # Keep the key filled in for rows loaded after the migration
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_sector_key_insert AFTER INSERT ON {table}
+        BEGIN
+            UPDATE {table} SET Sector_Key = lower(trim(NEW.Sector)) WHERE rowid = NEW.rowid;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_sector_key_update AFTER UPDATE OF Sector ON {table}
+        BEGIN
+            UPDATE {table} SET Sector_Key = lower(trim(NEW.Sector)) WHERE rowid = NEW.rowid;
+        END
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_sector_key ON {table} (Sector_Key)")
+
+
+def migration_1_lookup_indexes(conn):
+    _add_sector_key(conn, "stockracialharm")
+    _add_sector_key(conn, "asyousowrj")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_adasina_keywords ON adasina (Keyword1, Keyword2)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_stockharmdef2_key ON stockharmdef2 (Key)")
+
+
+# Append new migrations here; their position is their version number
+MIGRATIONS = [
+    migration_1_lookup_indexes,
+]
+
+# (name, lookup before migration 1, lookup after migration 1)
+LOOKUP_QUERIES = [
+    (
+        "sector rows",
+        "SELECT * FROM stockracialharm WHERE Sector LIKE '%Energy%'",
+        "SELECT * FROM stockracialharm WHERE Sector_Key = 'energy'",
+    ),
+    (
+        "screen response",
+        "SELECT Response FROM adasina WHERE Keyword1 = 'x' AND Keyword2 = 'y' LIMIT 1",
+        "SELECT Response FROM adasina WHERE Keyword1 = 'x' AND Keyword2 = 'y' LIMIT 1",
+    ),
+    (
+        "as you sow sector",
+        "SELECT a.* FROM asyousowrj a JOIN stockracialharm s ON a.Sector = s.Sector WHERE s.Sector LIKE '%Energy%'",
+        "SELECT a.* FROM asyousowrj a JOIN stockracialharm s ON a.Sector_Key = s.Sector_Key WHERE s.Sector_Key = 'energy'",
+    ),
+    (
+        "harm explanation",
+        "SELECT \"Harm-Magnitude\" FROM stockharmdef2 WHERE Key = 1",
+        "SELECT \"Harm-Magnitude\" FROM stockharmdef2 WHERE Key = 1",
+    ),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply pending migrations, each in its own transaction. Returns the new version.
+
+    The sqlite3 module only opens a transaction implicitly before DML, so the
+    ALTER TABLE / CREATE statements would autocommit one by one. Each
+    migration runs between an explicit BEGIN and COMMIT instead, with
+    user_version bumped inside it: a failure rolls the whole step back.
+    """
+    version = schema_version(conn)
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        for number, migration in enumerate(MIGRATIONS, start=1):
+            if number <= version:
+                continue
+            conn.execute("BEGIN")
+            try:
+                migration(conn)
+                conn.execute(f"PRAGMA user_version = {number}")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            version = number
+    finally:
+        conn.isolation_level = isolation_level
+    return version
+
+
+def explain(conn, query):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query."""
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")]
+
+
+def full_scans(plan):
+    # "SCAN x USING COVERING INDEX" still walks an index, not the table
+    return [line for line in plan if line.startswith("SCAN") and "INDEX" not in line]
+
+
+def query_plan_report(conn, after):
+    lines = []
+    for name, before_query, after_query in LOOKUP_QUERIES:
+        query = after_query if after else before_query
+        try:
+            plan = explain(conn, query)
+        except sqlite3.OperationalError as e:
+            lines.append(f"  {name}: {e}")
+            continue
+        flag = "FULL SCAN" if full_scans(plan) else "ok"
+        lines.append(f"  {name}: {flag}")
+        lines.extend(f"      {line}" for line in plan)
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations to the dashboard database.")
+    parser.add_argument("db_path")
+    parser.add_argument("--explain-only", action="store_true", help="print query plans without migrating")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        version = schema_version(conn)
+        print(f"Schema version {version}; query plans before:")
+        print("\n".join(query_plan_report(conn, after=version >= 1)))
+        if args.explain_only:
+            return
+        new_version = migrate(conn)
+        conn.execute("ANALYZE")
+        print(f"Schema version {new_version}; query plans after:")
+        report = query_plan_report(conn, after=True)
+        print("\n".join(report))
+        if any("FULL SCAN" in line for line in report):
+            raise SystemExit("Full table scans remain in the lookups above.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Shared read-only SQLite connections for the dashboard scripts.
+
+Every helper that used to call sqlite3.connect(DB_PATH) borrows a connection
+from here instead, so a Search no longer pays a connect/close per lookup.
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+# Upper bound on open connections per database file
+DEFAULT_POOL_SIZE = 8
+# Memory-map up to 256 MB of the database file
+MMAP_SIZE = 256 * 1024 * 1024
+# How long a caller waits for a free connection before giving up
+CHECKOUT_TIMEOUT = 30
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _enable_wal(db_path):
+    # journal_mode is stored in the file, so it has to be switched once from a
+    # writable connection; read-only connections cannot change it. mode=rw never
+    # creates the file, so a wrong DB_PATH fails on open instead of leaving an empty database.
+    try:
+        conn = sqlite3.connect(f"file:{quote(db_path)}?mode=rw", uri=True)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        # Read-only file or directory: fall back to whatever mode it already has
+        pass
+
+
+class ConnectionPool:
+    def __init__(self, db_path, max_size=DEFAULT_POOL_SIZE):
+        self.db_path = os.path.abspath(db_path)
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+        _enable_wal(self.db_path)
+
+    def _connect(self):
+        uri = f"file:{quote(self.db_path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute("PRAGMA query_only=1")
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        # Nested lookups on the same thread reuse the connection already held
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        if not self._slots.acquire(timeout=CHECKOUT_TIMEOUT):
+            raise TimeoutError(f"No free SQLite connection for {self.db_path}")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            self._local.conn = conn
+            try:
+                yield conn
+            finally:
+                self._local.conn = None
+                # Drop any half-read cursor state before handing it to the next caller
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+def get_pool(db_path, max_size=DEFAULT_POOL_SIZE):
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(key, max_size=max_size)
+            _pools[key] = pool
+        return pool
+
+
+def db_connection(db_path):
+    """Borrow a pooled read-only connection, e.g. ``with db_connection(DB_PATH) as conn:``."""
+    return get_pool(db_path).connection()
+
+
+def close_all():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,100 @@
+"""Row-level content hashing for overlapping exports.
+
+Rows are normalized (whitespace collapsed, numbers canonicalized) and hashed,
+then matched between two exports on the table's key columns. That gives the
+added / removed / changed rows, which is all ingest.py writes when a
+near-identical export is reloaded.
+
+    python delta.py proxy proxy.csv proxy1.csv
+"""
+import argparse
+import hashlib
+from collections import namedtuple
+
+Delta = namedtuple("Delta", ["added", "removed", "changed", "unchanged"])
+
+
+def normalize_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return ""
+        return repr(int(value)) if value.is_integer() else repr(value)
+    return " ".join(str(value).split())
+
+
+def row_hash(values):
+    joined = "\x1f".join(normalize_value(value) for value in values)
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def iter_keyed(rows, key_positions):
+    """Yield (key, hash, row), dropping exact duplicate rows.
+
+    Rows sharing key columns but differing elsewhere get an occurrence suffix
+    ("...#1") so they stay distinct. Keys depend only on row order, so two
+    passes over the same file yield the same keys.
+    """
+    seen_hashes = set()
+    occurrences = {}
+    for row in rows:
+        digest = row_hash(row)
+        if digest in seen_hashes:
+            continue
+        seen_hashes.add(digest)
+        base = "\x1f".join(normalize_value(row[i]) for i in key_positions)
+        n = occurrences.get(base, 0)
+        occurrences[base] = n + 1
+        yield f"{base}#{n}", digest, row
+
+
+def keyed_rows(rows, key_positions):
+    """Map key -> (hash, row); see iter_keyed()."""
+    return {key: (digest, row) for key, digest, row in iter_keyed(rows, key_positions)}
+
+
+def diff(old_hashes, new_hashes):
+    """Compare two {key: hash} maps."""
+    added = [key for key in new_hashes if key not in old_hashes]
+    removed = [key for key in old_hashes if key not in new_hashes]
+    changed = [key for key, digest in new_hashes.items() if key in old_hashes and old_hashes[key] != digest]
+    unchanged = len(new_hashes) - len(added) - len(changed)
+    return Delta(added, removed, changed, unchanged)
+
+
+def describe_key(key):
+    base, _, n = key.rpartition("#")
+    label = " | ".join(part for part in base.split("\x1f") if part)
+    return label if n == "0" else f"{label} (#{int(n) + 1})"
+
+
+def main():
+    from ingest import SOURCES, key_positions, read_rows
+
+    parser = argparse.ArgumentParser(description="Report added, removed and changed rows between two exports.")
+    parser.add_argument("table", choices=sorted(SOURCES))
+    parser.add_argument("old_path")
+    parser.add_argument("new_path")
+    parser.add_argument("--show", type=int, default=10, help="how many keys to list per category")
+    args = parser.parse_args()
+
+    spec = SOURCES[args.table]
+    positions = key_positions(spec)
+    old = keyed_rows(read_rows(args.old_path, spec), positions)
+    new = keyed_rows(read_rows(args.new_path, spec), positions)
+    delta = diff({k: v[0] for k, v in old.items()}, {k: v[0] for k, v in new.items()})
+
+    names = [name for name, _ in spec["columns"]]
+    print(f"{len(delta.added)} added, {len(delta.removed)} removed, {len(delta.changed)} changed, {delta.unchanged} unchanged")
+    for title, keys in (("Added", delta.added), ("Removed", delta.removed)):
+        for key in keys[:args.show]:
+            print(f"  {title}: {describe_key(key)}")
+    for key in delta.changed[:args.show]:
+        before, after = old[key][1], new[key][1]
+        columns = [name for name, a, b in zip(names, before, after) if normalize_value(a) != normalize_value(b)]
+        print(f"  Changed: {describe_key(key)} [{', '.join(columns)}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Largest-Triangle-Three-Buckets downsampling for line charts.
+
+A chart can't show more than about one point per horizontal pixel, so long
+price series are cut down to the chart's width before they are sent to
+plotly. LTTB keeps the first and last points and, from each bucket in
+between, the point forming the largest triangle with its neighbours; peaks,
+troughs and gaps survive where plain decimation would drop them.
+"""
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x, y, threshold):
+    """Positions of the ``threshold`` points LTTB keeps from ``x``/``y`` (sorted by ``x``)."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket edges for the threshold - 2 points between the fixed first and last ones
+    edges = (np.floor(np.arange(threshold - 1) * (n - 2) / (threshold - 2)) + 1).astype(int)
+    edges[-1] = n - 1
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Twice the triangle area, vectorized over the candidates in this bucket
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(series, max_points):
+    """Return ``series`` (DatetimeIndex or numeric index) cut to at most ``max_points`` points."""
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    index = series.index
+    if isinstance(index, pd.DatetimeIndex):
+        x = (index - index[0]) / pd.Timedelta(seconds=1)
+    else:
+        x = index
+    return series.iloc[lttb_indices(x, series.to_numpy(), max_points)]
+
+
+def points_for_width(width_px, points_per_pixel=1.0):
+    return max(3, int(width_px * points_per_pixel))
@@ -1,18 +1,18 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
+from db_migrations import normalize_sector
+from db_pool import db_connection
 
 # Database connection
 DB_PATH = "/Users/davidscatterday/Documents/python projects/NYC/nycprocurement.db"
 def get_sector_data(sector):
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT Sector, Description, Primary_Subsector, Subsector_Weight, Harm_Magnitude, Population_Impact, Directional_Movement, Total_Score
-    FROM stockracialharm
-    WHERE Sector LIKE ?
-    """
-    df = pd.read_sql_query(query, conn, params=(f"%{sector}%",))
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        query = """
+        SELECT Sector, Description, Primary_Subsector, Subsector_Weight, Harm_Magnitude, Population_Impact, Directional_Movement, Total_Score
+        FROM stockracialharm
+        WHERE Sector_Key = ?
+        """
+        df = pd.read_sql_query(query, conn, params=(normalize_sector(sector),))
     return df
 # Get all available sectors
 all_sectors = get_all_sectors()
@@ -34,47 +34,42 @@ with st.sidebar:
     
     submit_button = st.button("Search")
 def get_all_sectors():
-    conn = sqlite3.connect(DB_PATH)
-    query = "SELECT DISTINCT Sector FROM stockracialharm"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        query = "SELECT DISTINCT Sector FROM stockracialharm"
+        df = pd.read_sql_query(query, conn)
     return df['Sector'].tolist()
 
 def get_unique_values(column_name):
-    conn = sqlite3.connect(DB_PATH)
-    query = f"SELECT DISTINCT {column_name} FROM adasina WHERE {column_name} IS NOT NULL AND {column_name} != ''"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        query = f"SELECT DISTINCT {column_name} FROM adasina WHERE {column_name} IS NOT NULL AND {column_name} != ''"
+        df = pd.read_sql_query(query, conn)
     return df[column_name].tolist()
 
 def get_response(keyword1, keyword2):
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT Response FROM adasina WHERE Keyword1 = ? AND Keyword2 = ? LIMIT 1
-    """
-    df = pd.read_sql_query(query, conn, params=(keyword1, keyword2))
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        query = """
+        SELECT Response FROM adasina WHERE Keyword1 = ? AND Keyword2 = ? LIMIT 1
+        """
+        df = pd.read_sql_query(query, conn, params=(keyword1, keyword2))
     return df['Response'].iloc[0] if not df.empty else "No matching response found."
 
 # Function to get explanation based on harm magnitude
 def get_harm_explanation(magnitude):
-    conn = sqlite3.connect('DB_PATH)')
-    cursor = conn.cursor()
-    
-    if magnitude == 1:
-        column = "Harm-Magnitude-High"
-    elif magnitude == 2:
-        column = "Harm-Magnitude-Medium"
-    elif magnitude == 3:
-        column = "Harm-Magnitude-Low"
-    else:
-        return "No explanation available for this magnitude."
+    with db_connection(DB_PATH) as conn:
+        cursor = conn.cursor()
 
-    query = f"SELECT [{column}] FROM stockrhexplanation LIMIT 1"
-    cursor.execute(query)
-    result = cursor.fetchone()
-    
-    conn.close()
+        if magnitude == 1:
+            column = "Harm-Magnitude-High"
+        elif magnitude == 2:
+            column = "Harm-Magnitude-Medium"
+        elif magnitude == 3:
+            column = "Harm-Magnitude-Low"
+        else:
+            return "No explanation available for this magnitude."
+
+        query = f"SELECT [{column}] FROM stockrhexplanation LIMIT 1"
+        cursor.execute(query)
+        result = cursor.fetchone()
     
     return result[0] if result else "No explanation found."
 
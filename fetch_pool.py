@@ -0,0 +1,92 @@
+"""Shared worker pools for the independent fetches behind one Search.
+
+Quote, history, sector, screen and proxy lookups don't depend on each other,
+so they are submitted together and handed back as each one finishes. Only
+the fetching happens on the pool; rendering stays on the Streamlit script
+thread, which fills each section's placeholder as its data arrives.
+
+Each call keeps at most ``limit`` of its tasks on the pool and submits the
+next one as one finishes, so one session's fan-out can't fill the queue
+ahead of every other session's Search. Batch work (portfolio lookups) runs on
+its own pool and never takes Search workers.
+"""
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from rate_limit import current_priority, request_priority
+
+MAX_WORKERS = 32
+BATCH_WORKERS = 8
+# Tasks one call may have running or queued at a time
+PER_REQUEST = 6
+
+_executors = {}
+_executor_lock = threading.Lock()
+_active = 0
+_active_lock = threading.Lock()
+
+
+def _get_pool(name, workers):
+    # One pool per kind for the whole server process rather than one per script rerun
+    with _executor_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        return _executors[name]
+
+
+def get_executor():
+    return _get_pool("search-fetch", MAX_WORKERS)
+
+
+def get_batch_executor():
+    return _get_pool("batch-fetch", BATCH_WORKERS)
+
+
+def active_fetches():
+    """Search lookups currently running, a cheap measure of interactive load."""
+    with _active_lock:
+        return _active
+
+
+def _run(task, priority, counted):
+    global _active
+    if counted:
+        with _active_lock:
+            _active += 1
+    try:
+        # The caller's request priority is thread-local; carry it onto the worker
+        with request_priority(priority):
+            return task()
+    finally:
+        if counted:
+            with _active_lock:
+                _active -= 1
+
+
+def fetch_concurrently(tasks, limit=PER_REQUEST, batch=False):
+    """Run ``{name: callable}`` concurrently; yield ``(name, result, error)`` in completion order.
+
+    At most ``limit`` tasks are on the pool at once. ``batch=True`` uses the
+    batch pool, which doesn't count towards active_fetches().
+    """
+    executor = get_batch_executor() if batch else get_executor()
+    priority = current_priority()
+    pending = iter(tasks.items())
+    futures = {}
+
+    def submit_next():
+        for name, task in pending:
+            futures[executor.submit(_run, task, priority, not batch)] = name
+            return
+
+    for _ in range(max(1, limit)):
+        submit_next()
+    while futures:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = futures.pop(future)
+            submit_next()
+            try:
+                yield name, future.result(), None
+            except Exception as e:
+                yield name, None, e
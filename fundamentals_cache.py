@@ -0,0 +1,121 @@
+"""Shared cache of yf.Ticker(...).info snapshots with stale-while-revalidate.
+
+Slow-moving fields (sector, employees, EPS, ...) and fast-moving quote fields
+(currentPrice, dayHigh/dayLow, ...) expire on separate TTLs. A stale entry is
+returned immediately and refreshed on a background thread, so only the very
+first lookup of a ticker waits on upstream.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from market_data import get_provider
+from rate_limit import BACKGROUND, request_priority
+
+SLOW_TTL = 24 * 60 * 60
+FAST_TTL = 60
+
+
+def _fetch_info(ticker):
+    return get_provider().info(ticker)
+
+
+def _fetch_fast(ticker):
+    return get_provider().quote(ticker)
+
+
+class _Entry:
+    __slots__ = ("info", "slow_at", "fast_at")
+
+    def __init__(self, info, slow_at, fast_at):
+        self.info = info
+        self.slow_at = slow_at
+        self.fast_at = fast_at
+
+
+class FundamentalsCache:
+    def __init__(self, fetch_info=_fetch_info, fetch_fast=_fetch_fast, slow_ttl=SLOW_TTL, fast_ttl=FAST_TTL, workers=4):
+        self.fetch_info = fetch_info
+        self.fetch_fast = fetch_fast
+        self.slow_ttl = slow_ttl
+        self.fast_ttl = fast_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="info-refresh")
+
+    def _store(self, ticker, info, slow_at, fast_at):
+        with self._lock:
+            self._entries[ticker] = _Entry(info, slow_at, fast_at)
+
+    def _refresh(self, ticker, slow):
+        try:
+            # Revalidation never holds up an analyst's Search for a token
+            with request_priority(BACKGROUND):
+                self._revalidate(ticker, slow)
+        except Exception:
+            # Keep serving the stale copy; the next read schedules another attempt
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(ticker)
+
+    def _revalidate(self, ticker, slow):
+        now = time.time()
+        if slow:
+            self._store(ticker, self.fetch_info(ticker), now, now)
+            return
+        with self._lock:
+            entry = self._entries.get(ticker)
+        if entry is None:
+            return
+        info = dict(entry.info)
+        info.update(self.fetch_fast(ticker))
+        self._store(ticker, info, entry.slow_at, now)
+
+    def _schedule(self, ticker, slow):
+        with self._lock:
+            if ticker in self._refreshing:
+                return
+            self._refreshing.add(ticker)
+        self._executor.submit(self._refresh, ticker, slow)
+
+    def get(self, ticker):
+        """Return the info dict for ``ticker``; never waits on upstream once it has been fetched."""
+        ticker = ticker.upper()
+        with self._lock:
+            entry = self._entries.get(ticker)
+        if entry is None:
+            info = self.fetch_info(ticker)
+            now = time.time()
+            self._store(ticker, info, now, now)
+            return dict(info)
+
+        now = time.time()
+        if now - entry.slow_at >= self.slow_ttl:
+            self._schedule(ticker, slow=True)
+        elif now - entry.fast_at >= self.fast_ttl:
+            self._schedule(ticker, slow=False)
+        return dict(entry.info)
+
+    def age(self, ticker):
+        """Seconds since the quote fields of ``ticker`` were refreshed, or None if not cached."""
+        with self._lock:
+            entry = self._entries.get(ticker.upper())
+        return None if entry is None else time.time() - entry.fast_at
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = FundamentalsCache()
+        return _default_cache
+
+
+def get_info(ticker):
+    return get_cache().get(ticker)
@@ -0,0 +1,122 @@
+"""Racial-harm scores checked against the three component ratings.
+
+stockracialharm rates every sector/subsector 1-3 on Harm_Magnitude,
+Population_Impact and Directional_Movement. The stored scores are meant to be
+fixed functions of those ratings:
+
+    Total_Score         HM + PI + DM                      (3 .. 9)
+    Normalized_Score_1  5 * (Total - 3) / 6, to 2 places  (0 .. 5)
+    Normalized_Score_2  1 + 99 * (Total - 3) / 6          (1 .. 100)
+
+The stored values are what the dashboard shows. A derived score only fills in
+a score that was never recorded, and a row whose stored scores disagree with
+its ratings is flagged (Score_Mismatch, with the ratings' own score in
+Derived_Score) for the data owner rather than overridden. Weighted_Score
+scales Normalized_Score_2 by Subsector_Weight and is shown beside the Total
+Score.
+Quintile places each Normalized_Score_2 among all recorded scores (1 = lowest
+fifth), counting only the scores strictly below it so ties share a bucket.
+Everything is computed column-wise in one pass over the table.
+
+    python harm_scoring.py "/path/to/nycprocurement.db"
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+MIN_TOTAL, MAX_TOTAL = 3, 9
+DERIVED_COLUMNS = ["Total_Score", "Normalized_Score_1", "Normalized_Score_2"]
+SCORE_COLUMNS = DERIVED_COLUMNS + ["Weighted_Score", "Quintile", "Score_Explanation", "Score_Mismatch", "Derived_Score"]
+
+QUINTILE_NAMES = {1: "lowest", 2: "second lowest", 3: "middle", 4: "second highest", 5: "highest"}
+# Harm profiles as worded in the original dashboard text; quintiles without a
+# defined profile get the quintile sentence only
+QUINTILE_PROFILES = {2: "strong"}
+EXPLANATION = "This score corresponds with the {name} quintile of recorded scores"
+PROFILE = ' and indicates a "{profile}" profile of racial harm present in typical industry lifecycle activities'
+
+
+def quintile_explanation(quintile):
+    if quintile not in QUINTILE_NAMES:
+        return "Not enough component ratings to place this score among the recorded scores."
+    text = EXPLANATION.format(name=QUINTILE_NAMES[quintile])
+    if quintile in QUINTILE_PROFILES:
+        text += PROFILE.format(profile=QUINTILE_PROFILES[quintile])
+    return text + "."
+
+
+def quintiles(scores, recorded=None):
+    """1-5 bucket of each score among the ``recorded`` scores (default: ``scores`` themselves); 0 where NaN."""
+    scores = np.asarray(scores, dtype=float)
+    valid = ~np.isnan(scores)
+    recorded = scores[valid] if recorded is None else np.asarray(recorded, dtype=float)
+    recorded = np.sort(recorded[~np.isnan(recorded)])
+    buckets = np.zeros(len(scores), dtype=int)
+    if len(recorded):
+        below = np.searchsorted(recorded, scores[valid], side="left")
+        buckets[valid] = np.minimum(5 * below // len(recorded) + 1, 5)
+    return buckets
+
+
+def derived_scores(df):
+    """Total/Normalized scores computed from the component ratings; NaN where a rating is missing."""
+    components = df[["Harm_Magnitude", "Population_Impact", "Directional_Movement"]].apply(pd.to_numeric, errors="coerce")
+    total = components.to_numpy(dtype=float).sum(axis=1)
+    span = MAX_TOTAL - MIN_TOTAL
+    return pd.DataFrame({
+        "Total_Score": total,
+        "Normalized_Score_1": np.round(5 * (total - MIN_TOTAL) / span, 2),
+        "Normalized_Score_2": 1 + 99 * (total - MIN_TOTAL) / span,
+    }, index=df.index)
+
+
+def score_sectors(df):
+    """Return a copy of stockracialharm rows with the score columns filled in and checked.
+
+    Stored scores are kept; missing ones are derived from the ratings.
+    Score_Mismatch marks rows whose stored scores disagree with their ratings;
+    Derived_Score is the Normalized_Score_2 the ratings give.
+    """
+    df = df.copy()
+    derived = derived_scores(df)
+    mismatch = np.zeros(len(df), dtype=bool)
+    for column in DERIVED_COLUMNS:
+        computed = derived[column].to_numpy(dtype=float)
+        stored = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float) if column in df else np.full(len(df), np.nan)
+        both = ~np.isnan(stored) & ~np.isnan(computed)
+        mismatch |= both & ~np.isclose(stored, computed)
+        df[column] = np.where(np.isnan(stored), computed, stored)
+    weight = pd.to_numeric(df["Subsector_Weight"], errors="coerce").to_numpy(dtype=float)
+    df["Weighted_Score"] = df["Normalized_Score_2"].to_numpy(dtype=float) * weight
+    df["Quintile"] = quintiles(df["Normalized_Score_2"])
+    explanations = {quintile: quintile_explanation(quintile) for quintile in range(6)}
+    df["Score_Explanation"] = df["Quintile"].map(explanations)
+    df["Score_Mismatch"] = mismatch
+    df["Derived_Score"] = derived["Normalized_Score_2"]
+    return df
+
+
+def main():
+    from db_pool import db_connection
+    from refdata import SECTOR_QUERY
+
+    parser = argparse.ArgumentParser(description="Recompute the harm scores and compare them with the stored ones.")
+    parser.add_argument("db_path")
+    args = parser.parse_args()
+
+    with db_connection(args.db_path) as conn:
+        stored = pd.read_sql_query(SECTOR_QUERY, conn)
+    start = time.perf_counter()
+    scored = score_sectors(stored)
+    elapsed = time.perf_counter() - start
+    print(scored[["Sector", "Primary_Subsector"] + SCORE_COLUMNS[:5] + ["Score_Mismatch"]].to_string(index=False))
+    for _, row in scored[scored["Score_Mismatch"]].iterrows():
+        print(f"  {row['Sector']} / {row['Primary_Subsector']}: stored Normalized_Score_2 {row['Normalized_Score_2']:g}, "
+              f"ratings give {row['Derived_Score']:g}")
+    print(f"Scored {len(scored)} rows in {elapsed * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Return and risk indicators computed from the cached price arrays.
+
+For each ticker: trailing returns (1M, 6M, YTD, 1Y, 5Y), annualized
+volatility, max drawdown and beta against BENCHMARK over the last year, and
+the 50/200-day moving averages. A batch is laid out as one closes matrix with
+a column per ticker holding that ticker's own trailing bars, so every
+statistic is a handful of NaN-aware NumPy reductions over the whole batch
+rather than a loop, and no row depends on what else was in the batch.
+
+Rows are memoized per (ticker, last bar, benchmark's last bar): they are only
+recomputed once a top-up has added a bar.
+
+    python indicators.py AAPL MSFT TSLA
+"""
+import argparse
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from price_history import get_store
+
+BENCHMARK = "SPY"
+TRADING_DAYS = 252
+RETURN_PERIODS = {"1M": pd.DateOffset(months=1), "6M": pd.DateOffset(months=6), "1Y": pd.DateOffset(years=1),
+                  "5Y": pd.DateOffset(years=5)}
+INDICATOR_COLUMNS = ["Last Close", "Return 1M", "Return 6M", "Return YTD", "Return 1Y", "Return 5Y",
+                     "Volatility (Ann.)", "Max Drawdown 1Y", "Beta", "MA 50", "MA 200"]
+MEMO_SIZE = 4096
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _period_starts(series):
+    """Epoch-second cutoffs for each return period, matching price_history.slice_period."""
+    last = pd.Timestamp(int(series.ts[-1]), unit="s", tz="UTC").tz_convert(series.tz or "UTC")
+    starts = {period: (last - offset).tz_convert("UTC").timestamp() for period, offset in RETURN_PERIODS.items()}
+    starts["YTD"] = pd.Timestamp(year=last.year, month=1, day=1, tz=last.tz).tz_convert("UTC").timestamp()
+    return starts
+
+
+def _trailing_returns(series):
+    close = series.columns["Close"].astype(np.float64)
+    starts = _period_starts(series)
+    returns = {}
+    for period, cutoff in starts.items():
+        # slice_period keeps bars after the cutoff (on or after Jan 1 for YTD); the return runs from the bar before
+        side = "left" if period == "YTD" else "right"
+        first = int(np.searchsorted(series.ts, cutoff, side=side))
+        base = max(first - 1, 0)
+        returns[f"Return {period}"] = close[-1] / close[base] - 1 if close[base] else np.nan
+    return returns
+
+
+def _trailing_closes(series_list, bars):
+    """Closes matrix of shape (bars, len(series_list)): each column is that series' own last ``bars`` closes.
+
+    Columns are right-aligned on their latest bar and NaN-padded at the top
+    when a series is shorter, so no series' statistics depend on the others'.
+    """
+    matrix = np.full((bars, len(series_list)), np.nan)
+    for column, series in enumerate(series_list):
+        tail = series.columns["Close"][-bars:]
+        matrix[bars - len(tail):, column] = tail
+    return matrix
+
+
+def _benchmark_closes(series_list, benchmark_series, bars):
+    """Benchmark closes on each series' own last ``bars`` dates, laid out like _trailing_closes; NaN where it has no bar."""
+    matrix = np.full((bars, len(series_list)), np.nan)
+    bench_ts, bench_close = benchmark_series.ts, benchmark_series.columns["Close"]
+    for column, series in enumerate(series_list):
+        ts = series.ts[-bars:]
+        positions = np.minimum(np.searchsorted(bench_ts, ts), len(bench_ts) - 1)
+        hit = bench_ts[positions] == ts
+        aligned = np.full(len(ts), np.nan)
+        aligned[hit] = bench_close[positions[hit]]
+        matrix[bars - len(ts):, column] = aligned
+    return matrix
+
+
+def compute_indicators(series_by_ticker, benchmark_series=None):
+    """Indicator rows (DataFrame indexed by ticker) for ``{ticker: CompactSeries}``."""
+    tickers = [ticker for ticker, series in series_by_ticker.items() if len(series)]
+    if not tickers:
+        return pd.DataFrame(columns=INDICATOR_COLUMNS)
+    series_list = [series_by_ticker[ticker] for ticker in tickers]
+
+    # Each column holds its own last year of bars, so a row is the same whatever else is in the batch
+    bars = TRADING_DAYS + 1
+    closes = _trailing_closes(series_list, bars)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_returns = np.diff(np.log(closes), axis=0)
+        volatility = np.nanstd(log_returns, axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+
+        running_peak = np.fmax.accumulate(closes, axis=0)
+        max_drawdown = np.nanmin(closes / running_peak - 1, axis=0)
+
+        ma_50 = np.nanmean(closes[-50:], axis=0)
+        ma_200 = np.nanmean(closes[-200:], axis=0)
+
+        beta = np.full(len(tickers), np.nan)
+        if benchmark_series is not None and len(benchmark_series):
+            # The benchmark is aligned to each series' own dates; returns only count where both have a bar
+            bench = np.diff(np.log(_benchmark_closes(series_list, benchmark_series, bars)), axis=0)
+            both = ~np.isnan(log_returns) & ~np.isnan(bench)
+            r = np.where(both, log_returns, np.nan)
+            b = np.where(both, bench, np.nan)
+            covariance = np.nanmean(r * b, axis=0) - np.nanmean(r, axis=0) * np.nanmean(b, axis=0)
+            beta = covariance / np.nanvar(b, axis=0)
+
+    rows = {}
+    for column, (ticker, series) in enumerate(zip(tickers, series_list)):
+        row = {"Last Close": float(series.columns["Close"][-1])}
+        row.update(_trailing_returns(series))
+        row.update({
+            "Volatility (Ann.)": volatility[column],
+            "Max Drawdown 1Y": max_drawdown[column],
+            "Beta": beta[column],
+            "MA 50": ma_50[column],
+            "MA 200": ma_200[column],
+        })
+        rows[ticker] = row
+    frame = pd.DataFrame.from_dict(rows, orient="index", columns=INDICATOR_COLUMNS)
+    frame.index.name = "Symbol"
+    return frame
+
+
+def indicators_for(tickers, benchmark=BENCHMARK, store=None):
+    """Indicators for one ticker or a list, from the price store; returns (DataFrame, {ticker: error})."""
+    store = store or get_store()
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+    errors = store.refresh_many(tickers + ([benchmark] if benchmark else []))
+
+    benchmark_series = None
+    if benchmark and benchmark not in errors:
+        benchmark_series = store.get_compact(benchmark)
+    benchmark_last = benchmark_series.last_ts if benchmark_series is not None else None
+
+    rows, pending = {}, {}
+    for ticker in tickers:
+        if ticker in errors:
+            continue
+        try:
+            series = store.get_compact(ticker)
+        except Exception as e:
+            errors[ticker] = str(e)
+            continue
+        key = (ticker, series.last_ts, benchmark, benchmark_last)
+        with _memo_lock:
+            row = _memo.get(key)
+            if row is not None:
+                _memo.move_to_end(key)
+        if row is not None:
+            rows[ticker] = row
+        else:
+            pending[ticker] = (key, series)
+
+    if pending:
+        computed = compute_indicators({ticker: series for ticker, (_, series) in pending.items()}, benchmark_series)
+        with _memo_lock:
+            for ticker, row in computed.iterrows():
+                key = pending[ticker][0]
+                _memo[key] = rows[ticker] = row
+                while len(_memo) > MEMO_SIZE:
+                    _memo.popitem(last=False)
+
+    frame = pd.DataFrame([rows[ticker] for ticker in tickers if ticker in rows], columns=INDICATOR_COLUMNS)
+    frame.index = pd.Index([ticker for ticker in tickers if ticker in rows], name="Symbol")
+    return frame, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute return and risk indicators from the cached prices.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--benchmark", default=BENCHMARK)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frame, errors = indicators_for(args.tickers, args.benchmark)
+    print(frame.to_string(float_format=lambda value: f"{value:.4f}"))
+    for ticker, message in errors.items():
+        print(f"  {ticker}: FAILED ({message})")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""Load the source CSV exports into the dashboard database.
+
+    python ingest.py "/path/to/nycprocurement.db" [--data-dir .] [--force]
+
+Each CSV is streamed in chunks and written with executemany inside a single
+transaction. Header spellings that drift between exports ("Keyword 1",
+"Keyword1", "Sector ") are mapped onto the canonical column names. A file
+whose SHA-256 matches the last load of its table is skipped; otherwise only
+the rows added, removed or changed since the last load are written.
+"""
+import argparse
+import csv
+import datetime
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+from db_migrations import migrate
+from delta import diff, iter_keyed
+from response_search import rebuild_index
+
+CHUNK_SIZE = 1000
+RESPONSE_TABLES = ("adasina", "perplexity")
+
+# table -> source file pattern, canonical columns with SQLite types, header aliases,
+# and the key columns that identify a row between exports (see delta.py).
+# Aliases are compared after header_key(), so case, spaces, "_", "-" and "<br>" don't matter.
+SOURCES = {
+    "adasina": {
+        "pattern": "Adasina.csv",
+        "columns": [("Keyword1", "TEXT"), ("BridgeTerm", "TEXT"), ("Keyword2", "TEXT"), ("Response", "TEXT"), ("DetectionLevel", "TEXT")],
+        "aliases": {},
+        "key": ["Keyword1", "Keyword2"],
+    },
+    "perplexity": {
+        "pattern": "Perplexity_Results_*.csv",
+        "columns": [
+            ("Keyword1", "TEXT"), ("BridgeTerm", "TEXT"), ("Keyword2", "TEXT"), ("Response", "TEXT"),
+            ("Significant_Detection", "TEXT"), ("Marginal_Detection", "TEXT"), ("Negligible_Detection", "TEXT"),
+        ],
+        "aliases": {"perplexityresponse": "Response", "negligibleornodetection": "Negligible_Detection"},
+        "key": ["Keyword1", "Keyword2"],
+    },
+    "stockracialharm": {
+        "pattern": "stockracialharm2.csv",
+        "columns": [
+            ("Sector", "TEXT"), ("Description", "TEXT"), ("Primary_Subsector", "TEXT"), ("Subsector_Weight", "REAL"),
+            ("Harm_Magnitude", "INTEGER"), ("Population_Impact", "INTEGER"), ("Directional_Movement", "INTEGER"),
+            ("Total_Score", "REAL"), ("Normalized_Score_1", "REAL"), ("Normalized_Score_2", "REAL"),
+        ],
+        "aliases": {"popimpact": "Population_Impact", "directionaltrend": "Directional_Movement"},
+        "key": ["Sector", "Primary_Subsector"],
+    },
+    "stockharmdef2": {
+        "pattern": "stockrhexpl2.csv",
+        "columns": [("Key", "INTEGER"), ("Harm-Magnitude", "TEXT"), ("Pop-Impact", "TEXT"), ("Directional-Trend", "TEXT")],
+        "aliases": {"populationimpact": "Pop-Impact", "directionalmovement": "Directional-Trend"},
+        "key": ["Key"],
+    },
+    "asyousowrj": {
+        "pattern": "Asyousow-RacialJustice.csv",
+        "columns": [("Enterprise", "TEXT"), ("Category", "TEXT"), ("Score", "REAL"), ("Sector", "TEXT"), ("Region", "TEXT"), ("Employees", "TEXT")],
+        "aliases": {},
+        "key": ["Enterprise"],
+    },
+    "proxy": {
+        "pattern": "proxy.csv",
+        "columns": [
+            ("Meeting_Date", "TEXT"), ("Company", "TEXT"), ("Symbol", "TEXT"), ("Industry", "TEXT"), ("SubIndustry", "TEXT"),
+            ("Proposal_Type_General", "TEXT"), ("Proposal_Type_Specific", "TEXT"), ("Title", "TEXT"),
+            ("Proponent_Type_General", "TEXT"), ("Proponent_Type_Specific", "TEXT"), ("Proponent", "TEXT"), ("Votes_For", "REAL"),
+        ],
+        "aliases": {},
+        "key": ["Meeting_Date", "Company", "Title", "Proponent"],
+    },
+}
+
+
+def header_key(name):
+    return re.sub(r"[^a-z0-9]", "", name.replace("<br>", " ").lower())
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _convert(value, sql_type):
+    value = value.strip() if value is not None else ""
+    if value == "":
+        return None
+    if sql_type == "INTEGER":
+        try:
+            return int(float(value.replace(",", "")))
+        except ValueError:
+            return value
+    if sql_type == "REAL":
+        try:
+            return float(value.replace(",", ""))
+        except ValueError:
+            return value
+    return value
+
+
+def column_positions(header, spec):
+    """Map each canonical column to its index in ``header``; raise if one is missing."""
+    wanted = {header_key(name): name for name, _ in spec["columns"]}
+    wanted.update(spec["aliases"])
+    positions = {}
+    for index, raw in enumerate(header):
+        canonical = wanted.get(header_key(raw))
+        if canonical is not None and canonical not in positions:
+            positions[canonical] = index
+    missing = [name for name, _ in spec["columns"] if name not in positions]
+    if missing:
+        raise ValueError(f"Missing columns {missing} in header {header}")
+    return [positions[name] for name, _ in spec["columns"]]
+
+
+def read_rows(path, spec):
+    """Yield typed rows in canonical column order; utf-8-sig drops any BOM."""
+    types = [sql_type for _, sql_type in spec["columns"]]
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        positions = column_positions(next(reader), spec)
+        for record in reader:
+            row = tuple(
+                _convert(record[i] if i < len(record) else None, sql_type)
+                for i, sql_type in zip(positions, types)
+            )
+            if any(value is not None for value in row):
+                yield row
+
+
+def chunked(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _quoted(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def key_positions(spec):
+    names = [name for name, _ in spec["columns"]]
+    return [names.index(name) for name in spec["key"]]
+
+
+def ensure_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_log (
+            table_name TEXT PRIMARY KEY, source TEXT, sha256 TEXT, row_count INTEGER, loaded_at TEXT
+        )
+    """)
+    # Content hash of every loaded row, so a reload only touches the rows that differ
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_rows (
+            table_name TEXT, row_key TEXT, row_hash TEXT, row_id INTEGER,
+            PRIMARY KEY (table_name, row_key)
+        ) WITHOUT ROWID
+    """)
+    for table, spec in SOURCES.items():
+        columns = ", ".join(f"{_quoted(name)} {sql_type}" for name, sql_type in spec["columns"])
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+
+
+def load_table(conn, table, path):
+    """Bring ``table`` in line with ``path``, writing only the row delta.
+
+    Runs inside the caller's transaction and returns the delta.Delta. The
+    file is streamed twice: once to hash every row, then again to insert just
+    the rows added or changed, so only the key -> hash map is held in memory.
+    """
+    spec = SOURCES[table]
+    positions = key_positions(spec)
+    incoming = {key: digest for key, digest, _ in iter_keyed(read_rows(path, spec), positions)}
+    existing = {
+        key: (digest, row_id)
+        for key, digest, row_id in conn.execute(
+            "SELECT row_key, row_hash, row_id FROM ingest_rows WHERE table_name = ?", (table,)
+        )
+    }
+    if not existing:
+        # First load (or a table filled by hand): start from empty.
+        # DELETE rather than DROP keeps the migration's indexes and triggers.
+        conn.execute(f"DELETE FROM {table}")
+    changes = diff({key: value[0] for key, value in existing.items()}, incoming)
+
+    stale = changes.removed + changes.changed
+    for chunk in chunked(stale):
+        conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", [(existing[key][1],) for key in chunk])
+        conn.executemany("DELETE FROM ingest_rows WHERE table_name = ? AND row_key = ?", [(table, key) for key in chunk])
+
+    # Assign rowids up front so the insert can stay an executemany
+    names = ", ".join(["rowid"] + [_quoted(name) for name, _ in spec["columns"]])
+    placeholders = ", ".join("?" for _ in range(len(spec["columns"]) + 1))
+    insert = f"INSERT INTO {table} ({names}) VALUES ({placeholders})"
+    next_id = conn.execute(f"SELECT coalesce(max(rowid), 0) + 1 FROM {table}").fetchone()[0]
+    wanted = set(changes.added) | set(changes.changed)
+    if wanted:
+        rows = ((key, digest, row) for key, digest, row in iter_keyed(read_rows(path, spec), positions) if key in wanted)
+        for chunk in chunked(rows):
+            ids = range(next_id, next_id + len(chunk))
+            next_id += len(chunk)
+            conn.executemany(insert, [(row_id,) + row for row_id, (_, _, row) in zip(ids, chunk)])
+            conn.executemany(
+                "INSERT INTO ingest_rows VALUES (?, ?, ?, ?)",
+                [(table, key, digest, row_id) for row_id, (key, digest, _) in zip(ids, chunk)],
+            )
+    return changes
+
+
+def find_source(data_dir, pattern):
+    # For dated exports such as Perplexity_Results_<timestamp>.csv use the newest
+    matches = sorted(glob.glob(os.path.join(data_dir, pattern)))
+    return matches[-1] if matches else None
+
+
+def ingest(db_path, data_dir=".", force=False, overrides=None):
+    """Load every changed source file; returns {table: delta.Delta or None if skipped}.
+
+    ``overrides`` maps a table to a specific export to load instead of its default file.
+    """
+    overrides = overrides or {}
+    conn = sqlite3.connect(db_path)
+    results = {}
+    try:
+        with conn:
+            ensure_tables(conn)
+            for table, spec in SOURCES.items():
+                path = overrides.get(table) or find_source(data_dir, spec["pattern"])
+                if path is None:
+                    continue
+                digest = file_sha256(path)
+                previous = conn.execute("SELECT sha256 FROM ingest_log WHERE table_name = ?", (table,)).fetchone()
+                if previous and previous[0] == digest and not force:
+                    results[table] = None
+                    continue
+                changes = load_table(conn, table, path)
+                count = conn.execute("SELECT count(*) FROM ingest_rows WHERE table_name = ?", (table,)).fetchone()[0]
+                conn.execute(
+                    "INSERT OR REPLACE INTO ingest_log VALUES (?, ?, ?, ?, ?)",
+                    (table, os.path.basename(path), digest, count, datetime.datetime.now().isoformat(timespec="seconds")),
+                )
+                results[table] = changes
+        migrate(conn)
+        response_changes = [results.get(table) for table in RESPONSE_TABLES]
+        if any(changes and (changes.added or changes.removed or changes.changed) for changes in response_changes):
+            rebuild_index(conn)
+    finally:
+        conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load the source CSV exports into the dashboard database.")
+    parser.add_argument("db_path")
+    parser.add_argument("--data-dir", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--force", action="store_true", help="re-diff files even if unchanged")
+    parser.add_argument("--source", action="append", default=[], metavar="TABLE=PATH",
+                        help="load a specific export into TABLE, e.g. proxy=proxy1.csv")
+    args = parser.parse_args()
+    overrides = dict(item.split("=", 1) for item in args.source)
+
+    start = time.perf_counter()
+    results = ingest(args.db_path, args.data_dir, args.force, overrides)
+    for table, changes in results.items():
+        if changes is None:
+            print(f"  {table}: unchanged, skipped")
+        else:
+            print(f"  {table}: {len(changes.added)} added, {len(changes.removed)} removed, "
+                  f"{len(changes.changed)} changed, {changes.unchanged} unchanged")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
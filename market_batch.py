@@ -0,0 +1,113 @@
+"""Market data for a whole list of tickers at once.
+
+Price history is topped up with a handful of bulk yf.download calls (see
+PriceHistoryStore.refresh_many) instead of one request per ticker, and the
+info lookups fan out over a small thread pool through the shared
+fundamentals cache. One bad symbol doesn't sink the batch: whatever could be
+fetched is returned, and the failures are listed per ticker.
+
+    python market_batch.py AAPL MSFT TSLA --period 1Y
+"""
+import argparse
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from fundamentals_cache import get_cache
+from price_history import get_store, slice_period
+from rate_limit import BATCH, request_priority
+
+MAX_WORKERS = 8
+QUOTE_FIELDS = ["longName", "sector", "industry", "currentPrice", "previousClose", "marketCap", "currency"]
+
+BatchResult = namedtuple("BatchResult", ["history", "quotes", "errors"])
+
+
+def _quote_row(info, history):
+    row = {field: info.get(field) for field in QUOTE_FIELDS}
+    if row["currentPrice"] is None and not history.empty:
+        row["currentPrice"] = float(history["Close"].iloc[-1])
+    return row
+
+
+def _with_priority(priority, fn, *args):
+    with request_priority(priority):
+        return fn(*args)
+
+
+def fetch_batch(tickers, period="1Y", interval="1d", info=True, workers=MAX_WORKERS, store=None, cache=None,
+                priority=BATCH):
+    """Histories and quote fields for ``tickers``.
+
+    Returns BatchResult(history={ticker: frame sliced to ``period``},
+    quotes=DataFrame indexed by ticker, errors={ticker: message}).
+    Upstream calls queue behind interactive Searches at ``priority``.
+    """
+    with request_priority(priority):
+        return _fetch_batch(tickers, period, interval, info, workers, store, cache, priority)
+
+
+def _fetch_batch(tickers, period, interval, info, workers, store, cache, priority):
+    store = store or get_store()
+    cache = cache or get_cache()
+    # Normalize before deduplicating so " aapl" and "AAPL" are one ticker
+    tickers = list(dict.fromkeys(str(ticker).strip().upper() for ticker in tickers if str(ticker).strip()))
+
+    errors = store.refresh_many(tickers, interval)
+    now = pd.Timestamp.now(tz="UTC")
+    history = {}
+    for ticker in tickers:
+        if ticker in errors:
+            continue
+        try:
+            history[ticker] = slice_period(store.get_full(ticker, interval), period, now=now)
+        except Exception as e:
+            errors[ticker] = str(e)
+
+    quotes = pd.DataFrame(columns=QUOTE_FIELDS)
+    if info and tickers:
+        infos = {}
+        with ThreadPoolExecutor(max_workers=min(workers, len(tickers)), thread_name_prefix="batch-info") as pool:
+            futures = {ticker: pool.submit(_with_priority, priority, cache.get, ticker) for ticker in tickers}
+            for ticker, future in futures.items():
+                try:
+                    infos[ticker] = future.result()
+                except Exception as e:
+                    errors.setdefault(ticker, str(e))
+        rows = {
+            ticker: _quote_row(infos.get(ticker, {}), history.get(ticker, pd.DataFrame()))
+            for ticker in tickers if ticker in infos or ticker in history
+        }
+        if rows:
+            quotes = pd.DataFrame.from_dict(rows, orient="index", columns=QUOTE_FIELDS)
+    quotes.index.name = "Symbol"
+    return BatchResult(history, quotes, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch price history and quotes for several tickers at once.")
+    parser.add_argument("tickers", nargs="*", help="symbols; defaults to the portfolio workbook's holdings")
+    parser.add_argument("--period", default="1Y")
+    parser.add_argument("--no-info", action="store_true", help="skip the info lookups")
+    args = parser.parse_args()
+
+    tickers = args.tickers
+    if not tickers:
+        from portfolio import read_holdings
+        tickers = read_holdings()["Symbol"].tolist()
+
+    start = time.perf_counter()
+    result = fetch_batch(tickers, period=args.period, info=not args.no_info)
+    for ticker, frame in result.history.items():
+        print(f"  {ticker}: {len(frame)} bars")
+    if not result.quotes.empty:
+        print(result.quotes.to_string())
+    for ticker, message in result.errors.items():
+        print(f"  {ticker}: FAILED ({message})")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
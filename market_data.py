@@ -0,0 +1,312 @@
+"""Market-data providers: the only place that talks to yfinance.
+
+The caches (price_history, fundamentals_cache, market_batch) ask the current
+provider for info, quotes, history and batch history. Three implementations:
+
+    yfinance   live calls (the default)
+    replay     recorded responses from a fixture directory, no network at all
+    record     live calls, saving every response into the fixture directory
+
+Live calls go through RateLimitedProvider (rate_limit.py). Whichever provider
+is chosen is wrapped in CoalescingProvider, so concurrent identical requests
+(many sessions searching the same ticker) share one upstream call;
+coalescing_stats() reports how many calls that saved.
+
+Pick one with MARKET_DATA=yfinance|replay|record and point MARKET_DATA_FIXTURES
+at the fixture directory. To capture fixtures for a set of tickers:
+
+    python market_data.py AAPL MSFT TSLA --fixtures fixtures/market_data
+"""
+import argparse
+import datetime
+import json
+import os
+import re
+import threading
+
+import pandas as pd
+
+from rate_limit import call_limited, current_priority, get_bucket
+from singleflight import SingleFlight
+
+FIXTURE_DIR = os.environ.get(
+    "MARKET_DATA_FIXTURES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "market_data")
+)
+DEFAULT_PERIOD = "5y"
+
+# info keys refreshed from fast_info; everything else comes from the full info call
+FAST_INFO_FIELDS = {
+    "currentPrice": "last_price",
+    "previousClose": "previous_close",
+    "dayHigh": "day_high",
+    "dayLow": "day_low",
+    "marketCap": "market_cap",
+    "fiftyTwoWeekHigh": "year_high",
+    "fiftyTwoWeekLow": "year_low",
+}
+
+
+class YFinanceProvider:
+    name = "yfinance"
+
+    def __init__(self):
+        # Imported here so the replay provider runs where yfinance isn't installed
+        import yfinance
+        self.yf = yfinance
+
+    def info(self, ticker):
+        return dict(self.yf.Ticker(ticker).info)
+
+    def quote(self, ticker):
+        fast = self.yf.Ticker(ticker).fast_info
+        quote = {}
+        for field, attribute in FAST_INFO_FIELDS.items():
+            # Only a field this ticker lacks is skipped; throttling and network errors
+            # propagate so the limiter sees them and the cache keeps its stale quote
+            try:
+                value = getattr(fast, attribute)
+            except (AttributeError, KeyError):
+                continue
+            if value is not None:
+                quote[field] = value
+        if not quote:
+            raise LookupError(f"No quote fields available for {ticker}")
+        return quote
+
+    def history(self, ticker, interval="1d", start=None, period=DEFAULT_PERIOD):
+        stock = self.yf.Ticker(ticker)
+        if start is None:
+            return stock.history(period=period, interval=interval)
+        return stock.history(start=start, interval=interval)
+
+    def history_many(self, tickers, interval="1d", start=None, period=DEFAULT_PERIOD):
+        """One bulk yf.download for several tickers; returns {ticker: frame} for those with data."""
+        kwargs = {"period": period} if start is None else {"start": start}
+        data = self.yf.download(
+            list(tickers), interval=interval, group_by="ticker", auto_adjust=True, actions=True,
+            ignore_tz=False, progress=False, threads=True, **kwargs,
+        )
+        frames = {}
+        for ticker in tickers:
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            frame = data[ticker].dropna(how="all", subset=["Close"])
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+
+def _fixture_name(ticker):
+    return re.sub(r"[^A-Z0-9.^=-]", "_", ticker.upper())
+
+
+class ReplayProvider:
+    """Serves responses recorded by RecordingProvider; raises LookupError for anything not recorded.
+
+    Layout: <root>/info/<TICKER>.json and <root>/history/<interval>/<TICKER>.parquet.
+    """
+    name = "replay"
+
+    def __init__(self, root=FIXTURE_DIR):
+        self.root = root
+
+    def _info_path(self, ticker):
+        return os.path.join(self.root, "info", _fixture_name(ticker) + ".json")
+
+    def _history_path(self, ticker, interval):
+        return os.path.join(self.root, "history", interval, _fixture_name(ticker) + ".parquet")
+
+    def info(self, ticker):
+        path = self._info_path(ticker)
+        if not os.path.exists(path):
+            raise LookupError(f"No recorded info for {ticker} in {self.root}")
+        with open(path) as f:
+            return json.load(f)
+
+    def quote(self, ticker):
+        info = self.info(ticker)
+        return {field: info[field] for field in FAST_INFO_FIELDS if info.get(field) is not None}
+
+    def history(self, ticker, interval="1d", start=None, period=DEFAULT_PERIOD):
+        path = self._history_path(ticker, interval)
+        if not os.path.exists(path):
+            raise LookupError(f"No recorded {interval} history for {ticker} in {self.root}")
+        frame = pd.read_parquet(path)
+        if start is not None:
+            frame = frame[frame.index.date >= start]
+        return frame
+
+    def history_many(self, tickers, interval="1d", start=None, period=DEFAULT_PERIOD):
+        frames = {}
+        for ticker in tickers:
+            try:
+                frame = self.history(ticker, interval, start=start, period=period)
+            except LookupError:
+                continue
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+
+class RecordingProvider:
+    """Passes calls through to ``upstream`` and saves full responses for ReplayProvider."""
+    name = "record"
+
+    def __init__(self, upstream, root=FIXTURE_DIR):
+        self.upstream = upstream
+        self.replay = ReplayProvider(root)
+        self._lock = threading.Lock()
+
+    def _save_history(self, ticker, interval, frame):
+        if frame.empty:
+            return
+        path = self.replay._history_path(ticker, interval)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path):
+                # Top-ups only cover the latest bars: merge them into the recording
+                frame = pd.concat([pd.read_parquet(path), frame])
+                frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+            frame.to_parquet(path)
+
+    def info(self, ticker):
+        info = self.upstream.info(ticker)
+        path = self.replay._info_path(ticker)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(info, f, default=str, indent=1)
+        return info
+
+    def quote(self, ticker):
+        return self.upstream.quote(ticker)
+
+    def history(self, ticker, interval="1d", start=None, period=DEFAULT_PERIOD):
+        frame = self.upstream.history(ticker, interval, start=start, period=period)
+        self._save_history(ticker, interval, frame)
+        return frame
+
+    def history_many(self, tickers, interval="1d", start=None, period=DEFAULT_PERIOD):
+        frames = self.upstream.history_many(tickers, interval, start=start, period=period)
+        for ticker, frame in frames.items():
+            self._save_history(ticker, interval, frame)
+        return frames
+
+
+class RateLimitedProvider:
+    """Takes every call through the shared token bucket, with backoff on throttling (see rate_limit.py)."""
+
+    def __init__(self, upstream, bucket=None):
+        self.upstream = upstream
+        self.name = upstream.name
+        self.bucket = bucket or get_bucket()
+
+    def info(self, ticker):
+        return call_limited(self.bucket, self.upstream.info, ticker)
+
+    def quote(self, ticker):
+        return call_limited(self.bucket, self.upstream.quote, ticker)
+
+    def history(self, ticker, interval="1d", start=None, period=DEFAULT_PERIOD):
+        return call_limited(self.bucket, self.upstream.history, ticker, interval, start=start, period=period)
+
+    def history_many(self, tickers, interval="1d", start=None, period=DEFAULT_PERIOD):
+        # yf.download fetches each ticker separately under the hood, so charge for each
+        return call_limited(
+            self.bucket, self.upstream.history_many, tickers, interval, start=start, period=period, cost=len(tickers),
+        )
+
+
+class CoalescingProvider:
+    """Shares one upstream call among concurrent identical requests.
+
+    Calls are keyed on (ticker, endpoint, period, priority); for a top-up the
+    "period" is its start date. The priority class is part of the key because
+    a follower waits at the leader's priority: an analyst's Search must not
+    join a prefetch that is queued behind all the BACKGROUND work.
+    ``flights.saved`` counts the upstream calls avoided.
+    """
+
+    def __init__(self, upstream):
+        self.upstream = upstream
+        self.name = upstream.name
+        self.flights = SingleFlight()
+
+    def _do(self, key, fn, *args, **kwargs):
+        return self.flights.do(key + (current_priority(),), fn, *args, **kwargs)
+
+    def info(self, ticker):
+        return self._do((ticker.upper(), "info", None), self.upstream.info, ticker)
+
+    def quote(self, ticker):
+        return self._do((ticker.upper(), "quote", None), self.upstream.quote, ticker)
+
+    def history(self, ticker, interval="1d", start=None, period=DEFAULT_PERIOD):
+        key = (ticker.upper(), f"history:{interval}", str(start) if start is not None else period)
+        return self._do(key, self.upstream.history, ticker, interval, start=start, period=period)
+
+    def history_many(self, tickers, interval="1d", start=None, period=DEFAULT_PERIOD):
+        key = (tuple(sorted(ticker.upper() for ticker in tickers)), f"history_many:{interval}",
+               str(start) if start is not None else period)
+        return self._do(key, self.upstream.history_many, tickers, interval, start=start, period=period)
+
+
+def make_provider(kind=None, root=None):
+    kind = kind or os.environ.get("MARKET_DATA", "yfinance")
+    root = root or FIXTURE_DIR
+    if kind == "yfinance":
+        return CoalescingProvider(RateLimitedProvider(YFinanceProvider()))
+    if kind == "replay":
+        return CoalescingProvider(ReplayProvider(root))
+    if kind == "record":
+        return CoalescingProvider(RecordingProvider(RateLimitedProvider(YFinanceProvider()), root))
+    raise ValueError(f"Unknown MARKET_DATA provider {kind!r}; expected yfinance, replay or record")
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = make_provider()
+        return _provider
+
+
+def set_provider(provider):
+    """Swap the process-wide provider, e.g. to a ReplayProvider for a benchmark run."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+def coalescing_stats():
+    """Upstream calls executed and saved by single-flight coalescing in this process."""
+    flights = getattr(get_provider(), "flights", None)
+    return flights.stats() if flights is not None else {"executed": 0, "saved": 0, "in_flight": 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record info and price history fixtures for the replay provider.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--interval", default="1d")
+    args = parser.parse_args()
+
+    recorder = RecordingProvider(RateLimitedProvider(YFinanceProvider()), args.fixtures)
+    for ticker in args.tickers:
+        ticker = ticker.upper()
+        try:
+            recorder.info(ticker)
+            bars = len(recorder.history(ticker, args.interval))
+        except Exception as e:
+            print(f"  {ticker}: FAILED ({e})")
+            continue
+        print(f"  {ticker}: info + {bars} {args.interval} bars")
+    print(f"Recorded to {args.fixtures} at {datetime.datetime.now().isoformat(timespec='seconds')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Holdings from the portfolio tracker workbook, and their racial-harm exposure.
+
+30-Stock-Portfolio-tracker_with_vlookup_of_impact_score.xlsx keeps its
+holdings in a Stock / Symbol / Weight / Quantity / Last Price block a couple of
+rows down the first sheets, and the screened universe in "Impact Scores".
+
+portfolio_harm() replaces the workbook's per-holding VLOOKUP: it joins
+holdings to the sector harm scores, values them at the cached prices and
+returns exposure-weighted metrics per holding, per sector and in total.
+
+    python portfolio.py "/path/to/nycprocurement.db"
+"""
+import argparse
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from harm_scoring import quintile_explanation, quintiles
+from price_history import get_store
+from rate_limit import BATCH, request_priority
+from refdata import get_snapshot
+from sector_resolver import get_index
+
+PORTFOLIO_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "30-Stock-Portfolio-tracker_with_vlookup_of_impact_score.xlsx"
+)
+HOLDINGS_SHEET = "Max average portfolio return"
+UNIVERSE_SHEET = "Impact Scores"
+
+
+def _header_positions(row, names):
+    labels = [str(value).strip().lower() if value is not None else "" for value in row]
+    if not all(name.lower() in labels for name in names):
+        return None
+    return {name: labels.index(name.lower()) for name in names}
+
+
+def _read_block(sheet, names):
+    """Rows under the first row containing every header in ``names``, until the block runs out."""
+    positions = None
+    rows = []
+    for row in sheet.iter_rows(values_only=True):
+        if positions is None:
+            positions = _header_positions(row, names)
+            continue
+        values = [row[positions[name]] if positions[name] < len(row) else None for name in names]
+        symbol = values[names.index("Symbol")]
+        if symbol is None or str(symbol).strip() == "":
+            if rows:
+                break
+            continue
+        rows.append(values)
+    return pd.DataFrame(rows, columns=names)
+
+
+def read_holdings(path=PORTFOLIO_PATH, sheet=HOLDINGS_SHEET):
+    """Symbol and Quantity of each holding, one row per symbol."""
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        holdings = _read_block(workbook[sheet], ["Symbol", "Quantity"])
+    finally:
+        workbook.close()
+    holdings["Symbol"] = holdings["Symbol"].astype(str).str.strip().str.upper()
+    holdings["Quantity"] = pd.to_numeric(holdings["Quantity"], errors="coerce").fillna(0.0)
+    return holdings.groupby("Symbol", as_index=False, sort=False)["Quantity"].sum()
+
+
+def read_universe(path=PORTFOLIO_PATH, sheet=UNIVERSE_SHEET):
+    """Symbols listed on the Impact Scores sheet."""
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        universe = _read_block(workbook[sheet], ["Symbol"])
+    finally:
+        workbook.close()
+    return list(dict.fromkeys(universe["Symbol"].astype(str).str.strip().str.upper()))
+
+
+def read_sector_map(path=PORTFOLIO_PATH, sheet=UNIVERSE_SHEET):
+    """Symbol -> GICS Sector from the Impact Scores sheet (what the workbook's VLOOKUP keys on)."""
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        block = _read_block(workbook[sheet], ["Symbol", "GICS Sector"])
+    finally:
+        workbook.close()
+    block = block.dropna(subset=["GICS Sector"])
+    return dict(zip(block["Symbol"].astype(str).str.strip().str.upper(), block["GICS Sector"].astype(str).str.strip()))
+
+
+# Harm metrics aggregated over holdings. Everything below works on whole
+# columns: the holding -> sector join is an index lookup and the per-sector
+# sums are one bincount, so a book of 10,000 positions aggregates in a few ms.
+
+HARM_METRICS = ["Harm_Magnitude", "Population_Impact", "Directional_Movement", "Normalized_Score_2"]
+UNMAPPED = "Unmapped"
+
+PortfolioHarm = namedtuple("PortfolioHarm", ["holdings", "by_sector", "total", "errors"])
+
+
+def as_holdings(holdings):
+    """Accept a Symbol/Quantity frame or an iterable of (ticker, units) pairs."""
+    if not isinstance(holdings, pd.DataFrame):
+        holdings = pd.DataFrame(list(holdings), columns=["Symbol", "Quantity"])
+    holdings = holdings[["Symbol", "Quantity"]].copy()
+    holdings["Symbol"] = holdings["Symbol"].astype(str).str.strip().str.upper()
+    holdings["Quantity"] = pd.to_numeric(holdings["Quantity"], errors="coerce").fillna(0.0)
+    return holdings.reset_index(drop=True)
+
+
+def sector_harm_table(snapshot):
+    """Harm metrics per normalized sector, averaged over its subsectors by Subsector_Weight."""
+    frame = snapshot.sector_frame(snapshot.sectors)
+    keys = frame["Sector"].astype(str).str.strip(" ").str.lower()
+    weights = pd.to_numeric(frame["Subsector_Weight"], errors="coerce").fillna(1.0)
+    metrics = frame[HARM_METRICS].apply(pd.to_numeric, errors="coerce")
+    table = metrics.mul(weights, axis=0).groupby(keys).sum().div(weights.groupby(keys).sum(), axis=0)
+    table.insert(0, "Sector", frame.groupby(keys)["Sector"].first())
+    return table
+
+
+def aggregate_harm(holdings, prices, sectors, sector_table):
+    """Exposure-weighted harm metrics.
+
+    ``prices`` and ``sectors`` map Symbol -> last price / sector name. Returns
+    (per-holding frame, per-sector frame, portfolio totals dict).
+    """
+    holdings = as_holdings(holdings)
+    symbols = holdings["Symbol"]
+    quantity = holdings["Quantity"].to_numpy(dtype=float)
+    price = pd.Series(prices, dtype=float).reindex(symbols).to_numpy()
+    value = np.nan_to_num(quantity * price)
+    total_value = value.sum()
+
+    # Same key as db_migrations.normalize_sector, applied to the whole column
+    sector_names = pd.Series(sectors, dtype=object).reindex(symbols)
+    keys = sector_names.astype("string").str.strip(" ").str.lower()
+    codes = sector_table.index.get_indexer(keys.fillna(""))
+    mapped = codes >= 0
+    metrics = sector_table[HARM_METRICS].to_numpy(dtype=float)
+    holding_metrics = np.where(mapped[:, None], metrics[np.where(mapped, codes, 0)], np.nan)
+    weight = value / total_value if total_value else np.zeros(len(value))
+
+    by_holding = holdings.assign(
+        Price=price,
+        Market_Value=value,
+        Weight=weight,
+        Sector=np.where(mapped, sector_table["Sector"].to_numpy()[np.where(mapped, codes, 0)], UNMAPPED),
+    )
+    for i, column in enumerate(HARM_METRICS):
+        by_holding[column] = holding_metrics[:, i]
+    by_holding["Contribution"] = weight * holding_metrics[:, HARM_METRICS.index("Normalized_Score_2")]
+
+    sectors_count = len(sector_table)
+    sector_value = np.bincount(codes[mapped], weights=value[mapped], minlength=sectors_count)
+    sector_positions = np.bincount(codes[mapped], minlength=sectors_count)
+    present = sector_positions > 0
+    by_sector = pd.DataFrame({
+        "Sector": sector_table["Sector"].to_numpy()[present],
+        "Positions": sector_positions[present],
+        "Market_Value": sector_value[present],
+        "Weight": sector_value[present] / total_value if total_value else 0.0,
+    })
+    for i, column in enumerate(HARM_METRICS):
+        by_sector[column] = metrics[present, i]
+    by_sector["Contribution"] = by_sector["Weight"] * by_sector["Normalized_Score_2"]
+    unmapped_value = value[~mapped].sum()
+    if (~mapped).any():
+        unmapped = {"Sector": UNMAPPED, "Positions": int((~mapped).sum()), "Market_Value": unmapped_value,
+                    "Weight": unmapped_value / total_value if total_value else 0.0}
+        by_sector = pd.concat([by_sector, pd.DataFrame([unmapped])], ignore_index=True)
+    by_sector = by_sector.sort_values("Market_Value", ascending=False, ignore_index=True)
+
+    # Averages are over the value we could score, so unmapped holdings don't read as harmless
+    scored_value = value[mapped].sum()
+    total = {"Market_Value": float(total_value),
+             "Scored_Weight": float(scored_value / total_value) if total_value else 0.0}
+    for i, column in enumerate(HARM_METRICS):
+        total[column] = float(value[mapped] @ holding_metrics[mapped, i] / scored_value) if scored_value else np.nan
+    quintile = int(quintiles([total["Normalized_Score_2"]], metrics[:, HARM_METRICS.index("Normalized_Score_2")])[0])
+    total["Quintile"] = quintile
+    total["Score_Explanation"] = quintile_explanation(quintile)
+    return by_holding, by_sector, total
+
+
+def latest_prices(tickers, store=None):
+    """Last cached close per ticker (topped up in bulk); returns (prices, {ticker: error})."""
+    store = store or get_store()
+    errors = store.refresh_many(tickers)
+    prices = {}
+    for ticker in tickers:
+        if ticker in errors:
+            continue
+        try:
+            series = store.get_compact(ticker)
+        except Exception as e:
+            errors[ticker] = str(e)
+            continue
+        if len(series):
+            prices[ticker] = float(series.columns["Close"][-1])
+    return prices, errors
+
+
+def holding_sectors(tickers, db_path, path=PORTFOLIO_PATH):
+    """Harm sector per ticker: the workbook's GICS Sector first, then the provider's sector/industry.
+
+    Returns (sectors, {ticker: error}) so a failed lookup isn't mistaken for an unmapped sector.
+    """
+    hints = read_sector_map(path) if os.path.exists(path) else {}
+    matches, errors = get_index(db_path).resolve_tickers(tickers, hints)
+    return {ticker: match.sector for ticker, match in matches.items()}, errors
+
+
+def portfolio_harm(holdings, db_path, prices=None, sectors=None, store=None, priority=BATCH):
+    """Exposure-weighted harm metrics for ``holdings`` (frame or (ticker, units) pairs).
+
+    Prices default to the cached last close and sectors to holding_sectors().
+    Returns PortfolioHarm(holdings, by_sector, total, errors); ``errors`` lists
+    the tickers whose price or sector lookup failed, since those holdings are
+    left out of the scored value. Upstream calls queue behind interactive
+    Searches at ``priority``.
+    """
+    with request_priority(priority):
+        return _portfolio_harm(holdings, db_path, prices, sectors, store)
+
+
+def _portfolio_harm(holdings, db_path, prices, sectors, store):
+    holdings = as_holdings(holdings)
+    tickers = list(dict.fromkeys(holdings["Symbol"]))
+    errors = {}
+    if prices is None:
+        prices, errors = latest_prices(tickers, store)
+    if sectors is None:
+        sectors, sector_errors = holding_sectors(tickers, db_path)
+        for ticker, message in sector_errors.items():
+            errors[ticker] = f"{errors[ticker]}; {message}" if ticker in errors else message
+    by_holding, by_sector, total = aggregate_harm(holdings, prices, sectors, sector_harm_table(get_snapshot(db_path)))
+    return PortfolioHarm(by_holding, by_sector, total, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Racial-harm exposure of the portfolio tracker's holdings.")
+    parser.add_argument("db_path")
+    parser.add_argument("--workbook", default=PORTFOLIO_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = portfolio_harm(read_holdings(args.workbook), args.db_path)
+    print(result.by_sector.to_string(index=False))
+    print(f"Portfolio value ${result.total['Market_Value']:,.2f}, "
+          f"exposure-weighted score {result.total['Normalized_Score_2']:.1f} "
+          f"({result.total['Scored_Weight']:.0%} of value scored)")
+    for ticker, message in result.errors.items():
+        print(f"  {ticker}: FAILED ({message})")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Background warmer for the tickers we know analysts will search.
+
+The watchlist is the portfolio tracker's holdings followed by every Symbol in
+proxy.csv (most proposals first). Every CADENCE seconds a daemon thread walks
+it in small chunks, topping up the on-disk price history with bulk downloads
+and loading info into the fundamentals cache, at BACKGROUND priority so it
+only ever uses tokens a Search doesn't need. Each pass refreshes at most
+BUDGET tickers, resuming where the previous pass stopped, and waits while
+interactive load is above MAX_INTERACTIVE.
+
+    python prefetch.py --once
+"""
+import argparse
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+from fetch_pool import active_fetches
+from fundamentals_cache import get_cache
+from ingest import SOURCES, read_rows
+from portfolio import PORTFOLIO_PATH, read_holdings
+from price_history import get_store
+from rate_limit import BACKGROUND, INTERACTIVE, get_bucket, request_priority
+
+PROXY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "proxy.csv")
+
+CADENCE = int(os.environ.get("PREFETCH_CADENCE", 15 * 60))
+BUDGET = int(os.environ.get("PREFETCH_BUDGET", 60))
+CHUNK_SIZE = 10
+# Interactive upstream calls in the last 10s (or Search lookups running) above which the warmer waits
+MAX_INTERACTIVE = 4
+PAUSE_SECONDS = 5
+
+SYMBOL_PATTERN = re.compile(r"^[A-Z][A-Z0-9.\-]{0,9}$")
+
+
+def proxy_watchlist(path=PROXY_PATH):
+    spec = SOURCES["proxy"]
+    position = [name for name, _ in spec["columns"]].index("Symbol")
+    counts = Counter(row[position].strip().upper() for row in read_rows(path, spec) if row[position])
+    return [symbol for symbol, _ in counts.most_common()]
+
+
+def load_watchlist(proxy_path=PROXY_PATH, portfolio_path=PORTFOLIO_PATH):
+    """Portfolio holdings first, then proxy symbols; a missing source is skipped."""
+    tickers = []
+    if os.path.exists(portfolio_path):
+        tickers += read_holdings(portfolio_path)["Symbol"].tolist()
+    if os.path.exists(proxy_path):
+        tickers += proxy_watchlist(proxy_path)
+    return [ticker for ticker in dict.fromkeys(tickers) if SYMBOL_PATTERN.match(ticker)]
+
+
+def interactive_busy(threshold=MAX_INTERACTIVE):
+    return active_fetches() + get_bucket().load(INTERACTIVE) > threshold
+
+
+class Prefetcher:
+    def __init__(self, watchlist=load_watchlist, cadence=CADENCE, budget=BUDGET, chunk_size=CHUNK_SIZE,
+                 busy=interactive_busy, store=None, cache=None):
+        self.watchlist = watchlist
+        self.cadence = cadence
+        self.budget = budget
+        self.chunk_size = chunk_size
+        self.busy = busy
+        self.store = store or get_store()
+        self.cache = cache or get_cache()
+        self._cursor = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_pass = None
+
+    def _wait_for_quiet(self):
+        """Block while the app is busy with Searches; False if asked to stop meanwhile."""
+        while self.busy():
+            if self._stop.wait(PAUSE_SECONDS):
+                return False
+        return not self._stop.is_set()
+
+    def run_once(self):
+        """Refresh up to ``budget`` watchlist tickers; returns {"refreshed": [...], "errors": {...}}."""
+        tickers = self.watchlist()
+        if not tickers:
+            return {"refreshed": [], "errors": {}}
+        # Rotate so a budget smaller than the watchlist still covers all of it over a few passes
+        start = self._cursor % len(tickers)
+        due = (tickers[start:] + tickers[:start])[:self.budget]
+        refreshed, errors = [], {}
+        with request_priority(BACKGROUND):
+            for i in range(0, len(due), self.chunk_size):
+                if not self._wait_for_quiet():
+                    break
+                chunk = due[i:i + self.chunk_size]
+                failed = self.store.refresh_many(chunk)
+                errors.update(failed)
+                for ticker in chunk:
+                    try:
+                        self.cache.get(ticker)
+                    except Exception as e:
+                        errors.setdefault(ticker, str(e))
+                refreshed += [ticker for ticker in chunk if ticker not in errors]
+                self._cursor = start + i + len(chunk)
+        self.last_pass = time.time()
+        return {"refreshed": refreshed, "errors": errors}
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                # A bad pass (workbook open in Excel, upstream down) must not kill the warmer
+                pass
+            self._stop.wait(self.cadence)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def start_prefetcher():
+    """Start the process-wide warmer once; later calls (script reruns) are no-ops."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher()
+        _prefetcher.start()
+        return _prefetcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the market-data caches for the watchlist.")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--budget", type=int, default=BUDGET)
+    parser.add_argument("--cadence", type=int, default=CADENCE)
+    args = parser.parse_args()
+
+    prefetcher = Prefetcher(cadence=args.cadence, budget=args.budget)
+    while True:
+        start = time.perf_counter()
+        result = prefetcher.run_once()
+        print(f"Refreshed {len(result['refreshed'])} tickers in {time.perf_counter() - start:.1f}s")
+        for ticker, message in result["errors"].items():
+            print(f"  {ticker}: FAILED ({message})")
+        if args.once:
+            break
+        time.sleep(args.cadence)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""On-disk OHLCV store for yfinance price history.
+
+Bars are kept in a small SQLite database (.cache/prices.db) keyed by ticker,
+interval and bar timestamp. The first request for a ticker backfills the
+longest selectable window; later requests only download the bars since the
+last stored one, and every "1D"..."5Y" period is cut from the stored series.
+"""
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+import pandas as pd
+
+from compact_series import PRICE_COLUMNS, CompactSeries, get_series_cache
+from market_data import get_provider
+from rate_limit import current_priority
+
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "prices.db")
+
+# The longest timeframe offered in the sidebar; fetched once, everything else is sliced
+BACKFILL_PERIOD = "5y"
+# Stored bars younger than this are served without asking upstream for new ones
+FRESH_SECONDS = 15 * 60
+# How often a caller waiting on a series lock checks whether lower-priority work holds it
+CLAIM_POLL_SECONDS = 0.05
+
+PERIODS = ("1D", "5D", "1M", "6M", "YTD", "1Y", "5Y")
+EPOCH = pd.Timestamp(0, tz="UTC")
+
+
+def _download(ticker, interval, start=None):
+    return get_provider().history(ticker, interval, start=start, period=BACKFILL_PERIOD)
+
+
+def _download_many(tickers, interval, start=None):
+    return get_provider().history_many(tickers, interval, start=start, period=BACKFILL_PERIOD)
+
+
+def slice_period(history, period, now=None):
+    """Cut a selector period ("1D", "5D", "1M", "6M", "YTD", "1Y", "5Y") from a full history."""
+    if history.empty:
+        return history
+    period = period.upper()
+    if period == "1D":
+        return history.iloc[-1:]
+    if period == "5D":
+        return history.iloc[-5:]
+    if period == "YTD":
+        now = now or history.index[-1]
+        start = pd.Timestamp(year=now.year, month=1, day=1, tz=history.index.tz)
+        return history[history.index >= start]
+    offsets = {
+        "1M": pd.DateOffset(months=1),
+        "6M": pd.DateOffset(months=6),
+        "1Y": pd.DateOffset(years=1),
+        "5Y": pd.DateOffset(years=5),
+    }
+    if period not in offsets:
+        raise ValueError(f"Unknown period {period!r}; expected one of {PERIODS}")
+    return history[history.index > history.index[-1] - offsets[period]]
+
+
+def _epoch_seconds(index):
+    index = index if index.tz is not None else index.tz_localize("UTC")
+    return ((index.tz_convert("UTC") - EPOCH) // pd.Timedelta(seconds=1)).to_numpy()
+
+
+def _new_corporate_action(frame, last):
+    """Whether a bar after ``last`` (epoch seconds) carries a dividend or split.
+
+    Top-ups re-fetch the last stored bar, and any action on it is already in
+    the stored series, so only later bars count.
+    """
+    if frame.empty:
+        return False
+    newer = _epoch_seconds(frame.index) > last
+    return any(name in frame and (frame[name].fillna(0).to_numpy()[newer] != 0).any() for name in ("Dividends", "Stock Splits"))
+
+
+class PriceHistoryStore:
+    def __init__(self, path=STORE_PATH, download=_download, download_many=_download_many, memory=None):
+        self.path = path
+        self.download = download
+        self.download_many = download_many
+        self._conn_lock = threading.Lock()
+        self._conn = None
+        # One lock per (ticker, interval) so a slow download only blocks its own series
+        self._series_locks = {}
+        self._series_holders = {}
+        self._series_locks_lock = threading.Lock()
+        # Compact copies of recently used series, shared with every other session (see compact_series.py)
+        self._memory = memory or get_series_cache()
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS bars (
+                    ticker TEXT, interval TEXT, ts INTEGER,
+                    open REAL, high REAL, low REAL, close REAL, volume REAL, dividends REAL, splits REAL,
+                    PRIMARY KEY (ticker, interval, ts)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS series (
+                    ticker TEXT, interval TEXT, tz TEXT, fetched_at REAL,
+                    PRIMARY KEY (ticker, interval)
+                );
+            """)
+        return self._conn
+
+    def _series_lock(self, ticker, interval):
+        with self._series_locks_lock:
+            return self._series_locks.setdefault((ticker, interval), threading.Lock())
+
+    @contextmanager
+    def _claimed(self, ticker, interval):
+        """Hold the series lock, unless lower-priority work (e.g. the prefetcher) holds it.
+
+        A Search never queues behind a background top-up of the same series: it
+        goes ahead without the lock and downloads the series itself. Both writes
+        store the same bars, so the only cost is the extra download.
+        """
+        key = (ticker, interval)
+        lock = self._series_lock(ticker, interval)
+        priority = current_priority()
+        held = True
+        while not lock.acquire(timeout=CLAIM_POLL_SECONDS):
+            with self._series_locks_lock:
+                holder = self._series_holders.get(key)
+            if holder is not None and holder > priority:
+                held = False
+                break
+        if held:
+            with self._series_locks_lock:
+                self._series_holders[key] = priority
+        try:
+            yield
+        finally:
+            if held:
+                with self._series_locks_lock:
+                    self._series_holders.pop(key, None)
+                lock.release()
+
+    def _series_state(self, ticker, interval):
+        with self._conn_lock:
+            conn = self._connection()
+            series = conn.execute(
+                "SELECT tz, fetched_at FROM series WHERE ticker = ? AND interval = ?", (ticker, interval)
+            ).fetchone()
+            last = conn.execute(
+                "SELECT max(ts) FROM bars WHERE ticker = ? AND interval = ?", (ticker, interval)
+            ).fetchone()[0]
+        return series, last
+
+    def _write(self, ticker, interval, frame, tz, replace=False):
+        rows = []
+        if not frame.empty:
+            stamps = _epoch_seconds(frame.index)
+            columns = [frame[name] if name in frame else [0.0] * len(frame) for name in PRICE_COLUMNS]
+            rows = [
+                (ticker, interval, int(ts), *(float(value) for value in values))
+                for ts, *values in zip(stamps, *columns)
+            ]
+        self._memory.pop((self.path, ticker, interval))
+        with self._conn_lock:
+            conn = self._connection()
+            with conn:
+                if replace:
+                    conn.execute("DELETE FROM bars WHERE ticker = ? AND interval = ?", (ticker, interval))
+                conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.execute("INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?)", (ticker, interval, tz, time.time()))
+
+    def _read(self, ticker, interval, tz, fetched_at=None):
+        with self._conn_lock:
+            rows = self._connection().execute(
+                "SELECT ts, open, high, low, close, volume, dividends, splits FROM bars "
+                "WHERE ticker = ? AND interval = ? ORDER BY ts",
+                (ticker, interval),
+            ).fetchall()
+        return CompactSeries.from_rows(rows, tz or "UTC", fetched_at)
+
+    def refresh(self, ticker, interval="1d", force=False):
+        """Bring the stored series up to date; returns its timezone."""
+        series, last = self._series_state(ticker, interval)
+        if series is not None and not force and time.time() - series[1] < FRESH_SECONDS:
+            return series[0]
+        with self._claimed(ticker, interval):
+            # Another thread may have topped it up while we waited
+            series, last = self._series_state(ticker, interval)
+            if series is not None and not force and time.time() - series[1] < FRESH_SECONDS:
+                return series[0]
+
+            replace = series is None or last is None
+            if replace:
+                frame = self.download(ticker, interval)
+            else:
+                # Re-download the last stored bar too: it may have been an intraday partial
+                start = datetime.datetime.fromtimestamp(last, datetime.timezone.utc).date()
+                frame = self.download(ticker, interval, start=start)
+                if _new_corporate_action(frame, last):
+                    # Adjusted prices before the action have all moved: rebuild the series
+                    frame = self.download(ticker, interval)
+                    replace = True
+
+            if not frame.empty and frame.index.tz is not None:
+                tz = str(frame.index.tz)
+            else:
+                tz = series[0] if series else "UTC"
+            self._write(ticker, interval, frame, tz, replace=replace)
+            return tz
+
+    def _is_fresh(self, ticker, interval):
+        series, _ = self._series_state(ticker, interval)
+        return series is not None and time.time() - series[1] < FRESH_SECONDS
+
+    def refresh_many(self, tickers, interval="1d", chunk_size=50):
+        """Top up several series with a few bulk downloads instead of one call per ticker.
+
+        Each chunk holds its tickers' series locks (taken in sorted order) while
+        it downloads, so a concurrent refresh() of the same ticker at the same or
+        lower priority waits and then finds it fresh instead of downloading it again.
+
+        Returns {ticker: error message} for tickers upstream had no data for.
+        """
+        tickers = sorted(ticker.upper() for ticker in set(tickers))
+        stale = [ticker for ticker in tickers if not self._is_fresh(ticker, interval)]
+        errors, rebuild = {}, []
+        for i in range(0, len(stale), chunk_size):
+            chunk = stale[i:i + chunk_size]
+            with ExitStack() as claims:
+                for ticker in chunk:
+                    claims.enter_context(self._claimed(ticker, interval))
+                rebuild += self._refresh_chunk(chunk, interval, errors)
+        for ticker in rebuild:
+            # Corporate action inside the top-up window: rebuild just this series
+            self.refresh(ticker, interval, force=True)
+        return errors
+
+    def _refresh_chunk(self, chunk, interval, errors):
+        """Download and store the still-stale series of ``chunk``; the caller holds their locks.
+
+        Returns the tickers whose top-up showed a new dividend or split.
+        """
+        backfill, top_up = [], {}
+        for ticker in chunk:
+            # Re-check under the lock: another thread may have topped it up while we waited
+            series, last = self._series_state(ticker, interval)
+            if series is not None and time.time() - series[1] < FRESH_SECONDS:
+                continue
+            if series is None or last is None:
+                backfill.append(ticker)
+            else:
+                top_up[ticker] = last
+
+        rebuild = []
+        # New tickers share one backfill window; stale ones share the earliest start they need
+        groups = [(backfill, None)]
+        if top_up:
+            first = min(top_up.values())
+            groups.append((list(top_up), datetime.datetime.fromtimestamp(first, datetime.timezone.utc).date()))
+        for group, start in groups:
+            if not group:
+                continue
+            try:
+                frames = self.download_many(group, interval, start=start)
+            except Exception as e:
+                errors.update((ticker, str(e)) for ticker in group)
+                continue
+            for ticker in group:
+                frame = frames.get(ticker)
+                if frame is None:
+                    errors[ticker] = "No price data returned"
+                    continue
+                if start is not None and _new_corporate_action(frame, top_up[ticker]):
+                    rebuild.append(ticker)
+                    continue
+                tz = str(frame.index.tz) if frame.index.tz is not None else "UTC"
+                self._write(ticker, interval, frame, tz, replace=start is None)
+        return rebuild
+
+    def get_compact(self, ticker, interval="1d"):
+        """The whole stored series as a CompactSeries, topped up from upstream if stale.
+
+        While the series is fresh it is served from memory, so switching the
+        timeframe only re-slices it. Treat the returned arrays as read-only.
+        """
+        ticker = ticker.upper()
+        key = (self.path, ticker, interval)
+        series = self._memory.get(key)
+        if series is not None and time.time() - series.fetched_at < FRESH_SECONDS:
+            return series
+
+        tz = self.refresh(ticker, interval)
+        state, _ = self._series_state(ticker, interval)
+        series = self._read(ticker, interval, tz, fetched_at=state[1] if state else time.time())
+        self._memory.put(key, series)
+        return series
+
+    def get_full(self, ticker, interval="1d"):
+        """The whole stored series as a yfinance-shaped frame."""
+        return self.get_compact(ticker, interval).to_frame()
+
+    def get_history(self, ticker, period, interval="1d"):
+        """Same frame shape as ``yf.Ticker(ticker).history(period=period)``, served from disk."""
+        return slice_period(self.get_full(ticker, interval), period, now=pd.Timestamp.now(tz="UTC"))
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_store():
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = PriceHistoryStore()
+        return _default_store
+
+
+def get_history(ticker, period, interval="1d"):
+    return get_store().get_history(ticker, period, interval)
@@ -0,0 +1,232 @@
+"""Read the proxy-vote exports (ProxyMonitor.xls, proxy*.xlsx, proxy*.csv) into typed columns.
+
+Workbooks are read sheet by sheet with row-streaming readers (openpyxl in
+read_only mode, xlrd with on_demand sheets), so the whole workbook is never
+held in memory. The parsed columns are cached as a NumPy .npz per workbook;
+an unchanged workbook is served from that cache without opening it.
+"""
+import csv
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ingest import file_sha256, header_key
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "proxy")
+
+# Canonical proxy columns in display order; Industry/SubIndustry are missing from ProxyMonitor.xls
+PROXY_COLUMNS = [
+    "Meeting_Date", "Company", "Symbol", "Industry", "SubIndustry",
+    "Proposal_Type_General", "Proposal_Type_Specific", "Title",
+    "Proponent_Type_General", "Proponent_Type_Specific", "Proponent", "Votes_For",
+]
+REQUIRED_COLUMNS = ["Meeting_Date", "Company", "Symbol", "Title"]
+DATE_COLUMNS = {"Meeting_Date"}
+FLOAT_COLUMNS = {"Votes_For"}
+
+_cache_lock = threading.Lock()
+
+
+def _parse_date(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    for fmt in ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y"):
+        try:
+            return datetime.datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def _parse_percent(value, is_percent_format=False):
+    # Votes For is kept in percent units ("45.30%" -> 45.3); a %-formatted cell holds the fraction.
+    # Returns (value, is_bare_number) so a sheet of bare fractions can be rescaled.
+    if value is None or value == "":
+        return np.nan, False
+    if isinstance(value, (int, float)):
+        if is_percent_format:
+            return float(value) * 100, False
+        return float(value), True
+    text = str(value).strip().replace(",", "")
+    try:
+        return float(text.rstrip("%")), not text.endswith("%")
+    except ValueError:
+        return np.nan, False
+
+
+def _bare_fractions(values):
+    """True when a sheet's bare Votes For numbers are fractions rather than percents.
+
+    That takes at least one value strictly between 0 and 1 and none above 1: a
+    column of only 0s and 1s (or no numbers at all) says nothing about the scale
+    and is left as it is.
+    """
+    values = [value for value in values if not np.isnan(value)]
+    return any(0 < value < 1 for value in values) and all(value <= 1 for value in values)
+
+
+def _header_positions(header):
+    wanted = {header_key(name): name for name in PROXY_COLUMNS}
+    positions = {}
+    for index, raw in enumerate(header):
+        canonical = wanted.get(header_key(str(raw or "")))
+        if canonical is not None and canonical not in positions:
+            positions[canonical] = index
+    return positions
+
+
+def _iter_xlsx_sheets(path):
+    import openpyxl
+
+    # data_only gives the cached values of the formula cells in the Sheet2 tabs
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows()
+            header = next(rows, None)
+            if header is None:
+                continue
+            yield sheet.title, [cell.value for cell in header], (
+                [(cell.value, "%" in (cell.number_format or "")) for cell in row] for row in rows
+            )
+    finally:
+        workbook.close()
+
+
+def _iter_xls_sheets(path):
+    import xlrd
+
+    workbook = xlrd.open_workbook(path, on_demand=True)
+    try:
+        for name in workbook.sheet_names():
+            sheet = workbook.sheet_by_name(name)
+            if sheet.nrows:
+                yield name, sheet.row_values(0), (
+                    [(value, False) for value in sheet.row_values(i)] for i in range(1, sheet.nrows)
+                )
+            workbook.unload_sheet(name)
+    finally:
+        workbook.release_resources()
+
+
+def _iter_csv_sheets(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is not None:
+            yield "csv", header, ([(value, False) for value in record] for record in reader)
+
+
+def read_workbook(path):
+    """Stream every proxy sheet of ``path`` into a dict of typed NumPy columns."""
+    columns = {name: [] for name in PROXY_COLUMNS}
+    columns["Sheet"] = []
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".xls":
+        iter_sheets = _iter_xls_sheets
+    elif extension == ".csv":
+        iter_sheets = _iter_csv_sheets
+    else:
+        iter_sheets = _iter_xlsx_sheets
+    for sheet_name, header, rows in iter_sheets(path):
+        positions = _header_positions(header)
+        if any(name not in positions for name in REQUIRED_COLUMNS):
+            continue
+        bare_numbers = []
+        for row in rows:
+            parsed = {}
+            is_bare = False
+            for name in PROXY_COLUMNS:
+                index = positions.get(name)
+                value, is_percent = row[index] if index is not None and index < len(row) else (None, False)
+                if name in DATE_COLUMNS:
+                    value = _parse_date(value)
+                elif name in FLOAT_COLUMNS:
+                    value, is_bare = _parse_percent(value, is_percent)
+                else:
+                    value = "" if value is None else str(value).strip()
+                parsed[name] = value
+            # Notes pasted below the table have no meeting date or company
+            if parsed["Meeting_Date"] is None or not parsed["Company"]:
+                continue
+            if is_bare:
+                bare_numbers.append(len(columns["Sheet"]))
+            for name in PROXY_COLUMNS:
+                columns[name].append(parsed[name])
+            columns["Sheet"].append(sheet_name)
+        # Formula tabs and the CSV exports hold Votes For as bare fractions (0.1921 for 19.21%)
+        votes = columns["Votes_For"]
+        if _bare_fractions([votes[i] for i in bare_numbers]):
+            for i in bare_numbers:
+                votes[i] *= 100
+
+    typed = {}
+    for name, values in columns.items():
+        if name in DATE_COLUMNS:
+            typed[name] = np.array([v if v is not None else "NaT" for v in values], dtype="datetime64[D]")
+        elif name in FLOAT_COLUMNS:
+            typed[name] = np.array(values, dtype=np.float64)
+        else:
+            typed[name] = np.array(values, dtype=str)
+    return typed
+
+
+def _cache_paths(path, cache_dir):
+    stem = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+    base = os.path.join(cache_dir, f"{os.path.basename(path)}-{stem}")
+    return base + ".json", base + ".npz"
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def load_proxy_workbook(path, cache_dir=CACHE_DIR):
+    """Return the proxy rows of a workbook as a DataFrame, from the columnar cache when unchanged."""
+    meta_path, data_path = _cache_paths(path, cache_dir)
+    with _cache_lock:
+        meta = None
+        if os.path.exists(meta_path) and os.path.exists(data_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        stamp = _stamp(path)
+        fresh = meta is not None and meta["stamp"] == stamp
+        if meta is not None and not fresh:
+            # Touched but possibly not modified: fall back to the content hash
+            digest = file_sha256(path)
+            fresh = meta["sha256"] == digest
+            if fresh:
+                meta["stamp"] = stamp
+                with open(meta_path, "w") as f:
+                    json.dump(meta, f)
+        if fresh:
+            with np.load(data_path, allow_pickle=False) as data:
+                return pd.DataFrame({name: data[name] for name in meta["columns"]})
+
+        columns = read_workbook(path)
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(data_path, **columns)
+        with open(meta_path, "w") as f:
+            json.dump({"stamp": stamp, "sha256": file_sha256(path), "columns": list(columns)}, f)
+        return pd.DataFrame(columns)
+
+
+def load_proxy_workbooks(paths, cache_dir=CACHE_DIR):
+    frames = []
+    for path in paths:
+        df = load_proxy_workbook(path, cache_dir)
+        df.insert(0, "Source", os.path.basename(path))
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=["Source"] + PROXY_COLUMNS + ["Sheet"])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,133 @@
+"""Parquet store for proxy-vote records, partitioned by meeting year.
+
+    python proxy_store.py proxy.csv [ProxyMonitor.xls ...]
+
+Each Meeting_Year=<yyyy> partition is sorted by Symbol and written in small
+row groups with column statistics, so a filter on Symbol only reads the row
+groups whose min/max range can contain it, and only the requested columns.
+"""
+import argparse
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from delta import normalize_value
+from ingest import SOURCES
+from proxy_loader import PROXY_COLUMNS, load_proxy_workbooks
+
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "proxy_parquet")
+ROW_GROUP_SIZE = 128
+PARTITION_COLUMN = "Meeting_Year"
+
+
+def _partition_dir(root, year):
+    return os.path.join(root, f"{PARTITION_COLUMN}={year}")
+
+
+def write_proxy_store(df, root=STORE_PATH):
+    """Write proxy rows to ``root``, replacing the partitions for the years present in ``df``."""
+    df = df.dropna(subset=["Meeting_Date"])
+    years = df["Meeting_Date"].dt.year
+    for year in sorted(years.unique()):
+        part = df[years == year].drop(columns=["Source", "Sheet"], errors="ignore")
+        table = pa.Table.from_pandas(part, preserve_index=False).sort_by("Symbol")
+        target = _partition_dir(root, int(year))
+        staging = target + ".tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        pq.write_table(
+            table, os.path.join(staging, "part-0.parquet"),
+            row_group_size=ROW_GROUP_SIZE, write_statistics=True, compression="zstd",
+        )
+        # Swap the finished partition in so readers never see a half-written year
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+
+
+def dedupe_proposals(df):
+    """One row per proposal (the ingest key: Meeting_Date, Company, Title, Proponent).
+
+    The exports disagree on Industry/SubIndustry and proxy.csv rounds Votes_For
+    to whole percent, so rows are never identical across files. For each
+    proposal the row is taken from, in order of precedence: a workbook rather
+    than a CSV export, the row with the most columns filled in, and the export
+    listed last. Proposals listed twice within one sheet stay as two rows, as
+    ingest.py keeps them.
+    """
+    if df.empty:
+        return df
+    key = SOURCES["proxy"]["key"]
+    base = pd.Series(
+        ["\x1f".join(normalize_value(value) for value in row) for row in df[key].itertuples(index=False, name=None)],
+        index=df.index,
+    )
+    occurrence = base.groupby([df["Source"], df["Sheet"], base]).cumcount()
+    columns = df[PROXY_COLUMNS]
+    ranking = pd.DataFrame({
+        "csv": df["Source"].str.lower().str.endswith(".csv"),
+        "filled": (columns.notna() & columns.ne("")).sum(axis=1),
+        "export": pd.factorize(df["Source"])[0],
+        "base": base,
+        "occurrence": occurrence,
+    })
+    ranking = ranking.sort_values(["csv", "filled", "export"], ascending=[True, False, False], kind="stable")
+    keep = ranking.drop_duplicates(["base", "occurrence"]).index.sort_values()
+    return df.loc[keep].reset_index(drop=True)
+
+
+def _dataset(root):
+    return ds.dataset(root, format="parquet", partitioning="hive")
+
+
+def query_proxy(root=STORE_PATH, symbol=None, columns=None, years=None):
+    """Return proxy rows as a DataFrame, pushing the Symbol/year filter down to the row groups."""
+    if not os.path.isdir(root):
+        return None
+    dataset = _dataset(root)
+    expression = None
+    if symbol:
+        expression = ds.field("Symbol") == symbol.upper()
+    if years:
+        year_filter = ds.field(PARTITION_COLUMN).isin([int(year) for year in years])
+        expression = year_filter if expression is None else expression & year_filter
+    table = dataset.to_table(columns=columns, filter=expression)
+    return table.to_pandas()
+
+
+def votes_for_by_proposal_type(root=STORE_PATH, years=None):
+    """Average and count of Votes_For per Proposal_Type_General, reading only those two columns."""
+    if not os.path.isdir(root):
+        return None
+    expression = ds.field(PARTITION_COLUMN).isin([int(year) for year in years]) if years else None
+    table = _dataset(root).to_table(columns=["Proposal_Type_General", "Votes_For"], filter=expression)
+    grouped = table.group_by("Proposal_Type_General").aggregate([("Votes_For", "mean"), ("Votes_For", "count")])
+    grouped = grouped.sort_by([("Votes_For_mean", "descending")])
+    return grouped.to_pandas()
+
+
+def proxy_symbols(root=STORE_PATH):
+    if not os.path.isdir(root):
+        return []
+    symbols = pc.unique(_dataset(root).to_table(columns=["Symbol"])["Symbol"])
+    return sorted(symbol for symbol in symbols.to_pylist() if symbol)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Parquet store of proxy-vote records.")
+    parser.add_argument("paths", nargs="+", help="proxy CSV exports or workbooks")
+    parser.add_argument("--root", default=STORE_PATH)
+    args = parser.parse_args()
+
+    # Overlapping exports (and the duplicate Sheet2 tabs) collapse to one row per proposal
+    df = dedupe_proposals(load_proxy_workbooks(args.paths))
+    write_proxy_store(df, args.root)
+    print(f"Wrote {len(df)} proxy rows to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import streamlit as st
-import sqlite3
+from db_pool import db_connection
+from refdata import get_snapshot
 import pandas as pd
 import yfinance as yf
 import plotly.graph_objects as go
@@ -49,41 +50,27 @@ with st.sidebar:
 # Database connection
 DB_PATH = "/Users/davidscatterday/Documents/python projects/NYC/nycprocurement.db"
 
-def get_sector_data(sector):
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT Sector, Description, Primary_Subsector, Subsector_Weight, Harm_Magnitude, Population_Impact, Directional_Movement, Total_Score
-    FROM stockracialharm
-    WHERE Sector LIKE ?
-    """
-    df = pd.read_sql_query(query, conn, params=(f"%{sector}%",))
-    conn.close()
-    return df
+def get_sector_data(sectors):
+    return get_snapshot(DB_PATH).sector_frame(sectors)
 
 def get_all_sectors():
-    conn = sqlite3.connect(DB_PATH)
-    query = "SELECT DISTINCT Sector FROM stockracialharm"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df['Sector'].tolist()
+    return list(get_snapshot(DB_PATH).sectors)
 
 def get_unique_values(column_name):
-    conn = sqlite3.connect(DB_PATH)
-    query = f"SELECT DISTINCT {column_name} FROM adasina WHERE {column_name} IS NOT NULL AND {column_name} != ''"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df[column_name].tolist()
+    return list(get_snapshot(DB_PATH).facets[column_name])
+
+def get_screens(subindustry):
+    return list(get_snapshot(DB_PATH).facet_index.screens_for(subindustry))
 
 def get_response(keyword1, keyword2):
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT Response
-    FROM adasina
-    WHERE Keyword1 = ? AND Keyword2 = ?
-    LIMIT 1
-    """
-    df = pd.read_sql_query(query, conn, params=(keyword1, keyword2))
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        query = """
+        SELECT Response
+        FROM adasina
+        WHERE Keyword1 = ? AND Keyword2 = ?
+        LIMIT 1
+        """
+        df = pd.read_sql_query(query, conn, params=(keyword1, keyword2))
     return df['Response'].iloc[0] if not df.empty else "No matching response found."
 
 # Format market cap and enterprise value
@@ -100,7 +87,6 @@ all_sectors = get_all_sectors()
 
 # Get unique values for dropdowns
 subindustries = get_unique_values("Keyword1")
-social_justice_screens = get_unique_values("Keyword2")
 
 # Sidebar for user inputs
 with st.sidebar:
@@ -111,6 +97,8 @@ with st.sidebar:
     
     st.markdown("<h4 style='font-size: 18px;'>Social Justice Screen</h4>", unsafe_allow_html=True)
     subindustry = st.selectbox("Subindustry:", [""] + subindustries)
+    # Only offer screens that have a response for the chosen subindustry
+    social_justice_screens = get_screens(subindustry)
     social_justice_screen = st.selectbox("Social Justice Screen:", [""] + social_justice_screens)
     
     submit_button = st.button("Search")
@@ -0,0 +1,175 @@
+"""Process-wide rate limiting for upstream market-data calls.
+
+Every live call takes a token from one shared bucket, so all Streamlit
+sessions together stay under the rate upstream tolerates. Callers waiting for
+a token queue by priority: an analyst's Search (INTERACTIVE) goes ahead of
+portfolio refreshes (BATCH), which go ahead of prefetching and cache
+revalidation (BACKGROUND).
+
+When upstream throttles anyway, the bucket halves its rate and creeps back up
+on successes, and the call is retried after a jittered exponential backoff.
+"""
+import collections
+import contextlib
+import heapq
+import itertools
+import random
+import threading
+import time
+
+INTERACTIVE, BATCH, BACKGROUND = 0, 1, 2
+
+RATE = 2.0          # tokens per second while upstream is healthy
+MIN_RATE = 0.2      # floor after repeated throttling
+BURST = 10
+RECOVERY_STEP = 0.05
+RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+
+class UpstreamThrottled(Exception):
+    """Upstream kept refusing the call (or no token came free in time)."""
+
+
+def is_throttle_error(error):
+    if type(error).__name__ == "YFRateLimitError":
+        return True
+    message = str(error).lower()
+    return "too many requests" in message or "rate limit" in message or "429" in message
+
+
+def is_transient_error(error):
+    return isinstance(error, (ConnectionError, TimeoutError)) or is_throttle_error(error)
+
+
+_context = threading.local()
+
+
+def current_priority():
+    return getattr(_context, "priority", INTERACTIVE)
+
+
+@contextlib.contextmanager
+def request_priority(priority):
+    """Tag the upstream calls made by this thread inside the block with ``priority``."""
+    previous = current_priority()
+    _context.priority = priority
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+
+class TokenBucket:
+    def __init__(self, rate=RATE, burst=BURST, min_rate=MIN_RATE, recovery_step=RECOVERY_STEP):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.recovery_step = recovery_step
+        self.tokens = float(burst)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+        # (granted at, priority) of recent grants, for load checks such as the prefetcher's
+        self._grants = collections.deque(maxlen=1000)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority=None, cost=1, timeout=None):
+        """Block until ``cost`` tokens are granted; lower ``priority`` values are served first."""
+        priority = current_priority() if priority is None else priority
+        cost = min(cost, self.burst)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    self._refill()
+                    at_head = self._waiters[0] == entry
+                    if at_head and self.tokens >= cost:
+                        heapq.heappop(self._waiters)
+                        self.tokens -= cost
+                        self._grants.append((time.monotonic(), priority))
+                        self._cond.notify_all()
+                        return
+                    wait = (cost - self.tokens) / self.rate if at_head else None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise UpstreamThrottled(f"No upstream capacity within {timeout:g}s")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def throttled(self):
+        """Upstream pushed back: halve the rate and drain the bucket."""
+        with self._cond:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+
+    def succeeded(self):
+        with self._cond:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def load(self, priority, window=10.0):
+        """Calls at ``priority`` granted in the last ``window`` seconds plus those still waiting."""
+        since = time.monotonic() - window
+        with self._cond:
+            granted = sum(1 for at, level in self._grants if at >= since and level == priority)
+            return granted + sum(1 for level, _ in self._waiters if level == priority)
+
+    def stats(self):
+        with self._cond:
+            self._refill()
+            return {"rate": self.rate, "tokens": self.tokens, "waiting": len(self._waiters)}
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    # "Full jitter": spread the retries of many sessions instead of synchronizing them
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def call_limited(bucket, fn, *args, cost=1, retries=RETRIES, **kwargs):
+    """Run ``fn`` under ``bucket``, retrying throttled or transient failures with backoff."""
+    for attempt in range(retries + 1):
+        bucket.acquire(cost=cost)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if not is_transient_error(e):
+                raise
+            if is_throttle_error(e):
+                bucket.throttled()
+            if attempt == retries:
+                raise UpstreamThrottled(f"Upstream still failing after {retries + 1} attempts: {e}") from e
+            time.sleep(backoff_delay(attempt))
+            continue
+        bucket.succeeded()
+        return result
+
+
+_bucket = None
+_bucket_lock = threading.Lock()
+
+
+def get_bucket():
+    global _bucket
+    with _bucket_lock:
+        if _bucket is None:
+            _bucket = TokenBucket()
+        return _bucket
@@ -0,0 +1,196 @@
+"""In-memory snapshot of the small, nearly static reference tables.
+
+stockracialharm (joined with its stockharmdef2 explanations and scored by
+harm_scoring), stockharmdef2, asyousowrj and the adasina Keyword1/Keyword2
+facet index are loaded once per process and served from memory on every
+Streamlit rerun. The snapshot is rebuilt when the database file (or its WAL)
+changes on disk or SQLite's data_version moves.
+"""
+import os
+import sqlite3
+import threading
+from types import MappingProxyType
+from urllib.parse import quote
+
+import pandas as pd
+
+from db_migrations import normalize_sector
+from db_pool import db_connection
+from harm_scoring import score_sectors
+
+SECTOR_QUERY = """
+SELECT s.Sector, s.Description, s.Primary_Subsector, s.Subsector_Weight, s.Harm_Magnitude, s.Population_Impact, s.Directional_Movement, s.Total_Score, s.Normalized_Score_1, s.Normalized_Score_2,
+    COALESCE(hm."Harm-Magnitude", 'Not found') AS Harm_Magnitude_Content,
+    COALESCE(pi."Pop-Impact", 'Not found') AS Population_Impact_Content,
+    COALESCE(dt."Directional-Trend", 'Not found') AS Directional_Movement_Content
+FROM stockracialharm s
+LEFT JOIN stockharmdef2 hm ON hm.Key = s.Harm_Magnitude
+LEFT JOIN stockharmdef2 pi ON pi.Key = s.Population_Impact
+LEFT JOIN stockharmdef2 dt ON dt.Key = s.Directional_Movement
+"""
+
+FACET_QUERY = """
+SELECT Keyword1, Keyword2, count(*) AS Responses
+FROM adasina
+WHERE Keyword1 IS NOT NULL AND Keyword1 != '' AND Keyword2 IS NOT NULL AND Keyword2 != ''
+    AND Response IS NOT NULL AND Response != ''
+GROUP BY Keyword1, Keyword2
+"""
+
+
+def _freeze(df):
+    columns = tuple(df.columns)
+    rows = tuple(tuple(row) for row in df.itertuples(index=False, name=None))
+    return columns, rows
+
+
+def _display_order(values):
+    return tuple(sorted(values, key=lambda value: str(value).casefold()))
+
+
+class FacetIndex:
+    """Distinct Keyword1/Keyword2 values with response counts and the valid pairs between them."""
+
+    def __init__(self, pairs):
+        counts = {"Keyword1": {}, "Keyword2": {}}
+        screens = {}
+        for keyword1, keyword2, responses in pairs:
+            counts["Keyword1"][keyword1] = counts["Keyword1"].get(keyword1, 0) + responses
+            counts["Keyword2"][keyword2] = counts["Keyword2"].get(keyword2, 0) + responses
+            screens.setdefault(keyword1, set()).add(keyword2)
+        self.counts = MappingProxyType({column: MappingProxyType(values) for column, values in counts.items()})
+        self.values = MappingProxyType({column: _display_order(values) for column, values in counts.items()})
+        self.screens_by_subindustry = MappingProxyType(
+            {keyword1: _display_order(keyword2s) for keyword1, keyword2s in screens.items()}
+        )
+
+    def screens_for(self, subindustry):
+        """Keyword2 screens that have a response for ``subindustry`` (all screens if none chosen)."""
+        if not subindustry:
+            return self.values["Keyword2"]
+        return self.screens_by_subindustry.get(subindustry, ())
+
+
+def _index_by(columns, rows, column, key=None):
+    position = columns.index(column)
+    index = {}
+    for row in rows:
+        value = row[position] if key is None else key(row[position])
+        index.setdefault(value, []).append(row)
+    return MappingProxyType({key: tuple(value) for key, value in index.items()})
+
+
+class RefSnapshot:
+    """Read-only view of the reference tables, indexed by normalized Sector and Key."""
+
+    def __init__(self, sectors, definitions, asyousow, facet_index):
+        self.sector_columns, self.sector_rows = sectors
+        self.definition_columns, self.definition_rows = definitions
+        self.asyousow_columns, self.asyousow_rows = asyousow
+        self.by_sector = _index_by(self.sector_columns, self.sector_rows, "Sector", normalize_sector)
+        self.definitions_by_key = _index_by(self.definition_columns, self.definition_rows, "Key")
+        self.asyousow_by_sector = _index_by(self.asyousow_columns, self.asyousow_rows, "Sector", normalize_sector)
+        self.sectors = tuple(dict.fromkeys(row[0] for row in self.sector_rows))
+        self.facet_index = facet_index
+        self.facets = facet_index.values
+
+    def matching_sectors(self, sectors):
+        # Exact match on the normalized sector key, like the Sector_Key index
+        if isinstance(sectors, str):
+            sectors = [sectors]
+        keys = dict.fromkeys(normalize_sector(sector) for sector in sectors)
+        return [key for key in keys if key in self.by_sector]
+
+    def sector_frame(self, sectors):
+        rows = [row for key in self.matching_sectors(sectors) for row in self.by_sector[key]]
+        return pd.DataFrame(rows, columns=list(self.sector_columns))
+
+    def asyousow_frame(self, sectors, harm_sector=None):
+        """As You Sow rows for ``sectors``, one copy per stockracialharm row as the SQL join produced.
+
+        By default each sector is joined on its own name. Pass ``harm_sector``
+        when ``sectors`` are As You Sow spellings of one stockracialharm sector
+        (see sector_resolver), so the rows are read under those spellings and
+        repeated per row of the harm sector.
+        """
+        if isinstance(sectors, str):
+            sectors = [sectors]
+        rows = []
+        for key in dict.fromkeys(normalize_sector(sector) for sector in sectors):
+            copies = len(self.by_sector.get(normalize_sector(harm_sector) if harm_sector else key, ()))
+            for _ in range(copies):
+                rows.extend(self.asyousow_by_sector.get(key, ()))
+        return pd.DataFrame(rows, columns=list(self.asyousow_columns))
+
+    def definition(self, key, column):
+        rows = self.definitions_by_key.get(key)
+        if not rows:
+            return "Not found"
+        return rows[0][self.definition_columns.index(column)]
+
+
+def _load_snapshot(db_path):
+    with db_connection(db_path) as conn:
+        # Scores and quintiles are derived from the component ratings across the whole table
+        sectors = _freeze(score_sectors(pd.read_sql_query(SECTOR_QUERY, conn)))
+        definitions = _freeze(pd.read_sql_query("SELECT * FROM stockharmdef2", conn))
+        asyousow_df = pd.read_sql_query("SELECT * FROM asyousowrj", conn)
+        # The migration's lookup column is not part of what the dashboard shows
+        asyousow = _freeze(asyousow_df.drop(columns=["Sector_Key"], errors="ignore"))
+        facet_index = FacetIndex(conn.execute(FACET_QUERY).fetchall())
+    return RefSnapshot(sectors, definitions, asyousow, facet_index)
+
+
+class _SnapshotHolder:
+    def __init__(self, db_path):
+        self.db_path = os.path.abspath(db_path)
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._mtimes = None
+        self._data_version = None
+        self._watch_conn = None
+
+    def _file_mtimes(self):
+        mtimes = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _current_data_version(self):
+        # data_version is per connection, so it has to be read from the same
+        # dedicated handle every time rather than from a pooled one.
+        if self._watch_conn is None:
+            uri = f"file:{quote(self.db_path)}?mode=ro"
+            self._watch_conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        return self._watch_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def get(self):
+        with self._lock:
+            mtimes = self._file_mtimes()
+            if mtimes != self._mtimes and self._watch_conn is not None:
+                # The file may have been replaced; watch the new one
+                self._watch_conn.close()
+                self._watch_conn = None
+            data_version = self._current_data_version()
+            if self._snapshot is None or mtimes != self._mtimes or data_version != self._data_version:
+                self._snapshot = _load_snapshot(self.db_path)
+                self._mtimes = mtimes
+                self._data_version = data_version
+            return self._snapshot
+
+
+_holders = {}
+_holders_lock = threading.Lock()
+
+
+def get_snapshot(db_path):
+    key = os.path.abspath(db_path)
+    with _holders_lock:
+        holder = _holders.get(key)
+        if holder is None:
+            holder = _SnapshotHolder(key)
+            _holders[key] = holder
+    return holder.get()
@@ -0,0 +1,106 @@
+"""Full-text search over the Adasina and Perplexity screen responses.
+
+The adasina and perplexity tables are copied into an FTS5 table
+(responses_fts) in the dashboard database. ingest.py rebuilds it after every
+load (Perplexity_Results exports go in through ingest.py); to rebuild it by hand:
+
+    python response_search.py "/path/to/nycprocurement.db"
+
+The dashboard then queries it through the read-only connection pool with
+BM25 ranking and highlighted snippets.
+"""
+import argparse
+import re
+import sqlite3
+
+import pandas as pd
+
+from db_pool import db_connection
+
+FTS_TABLE = "responses_fts"
+
+# Column weights for bm25(): Source is unindexed, keywords count more than body text
+BM25_WEIGHTS = (0.0, 4.0, 4.0, 1.0)
+
+SEARCH_QUERY = f"""
+SELECT Source, Keyword1, Keyword2,
+    snippet({FTS_TABLE}, 3, '**', '**', ' … ', 32) AS Snippet,
+    bm25({FTS_TABLE}, {", ".join(str(w) for w in BM25_WEIGHTS)}) AS Rank
+FROM {FTS_TABLE}
+WHERE {FTS_TABLE} MATCH ?
+ORDER BY Rank
+LIMIT ?
+"""
+
+
+def create_index(conn):
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            Source UNINDEXED, Keyword1, Keyword2, Response,
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+    """)
+
+
+def rebuild_index(conn):
+    """Repopulate responses_fts from the adasina and perplexity tables."""
+    with conn:
+        create_index(conn)
+        conn.execute(f"DELETE FROM {FTS_TABLE}")
+        conn.execute(f"""
+            INSERT INTO {FTS_TABLE} (Source, Keyword1, Keyword2, Response)
+            SELECT 'Adasina', Keyword1, Keyword2, Response FROM adasina
+            WHERE Response IS NOT NULL AND Response != ''
+        """)
+        # Exports already loaded by ingest.py live in the perplexity table
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'perplexity'").fetchone():
+            conn.execute(f"""
+                INSERT INTO {FTS_TABLE} (Source, Keyword1, Keyword2, Response)
+                SELECT 'Perplexity', Keyword1, Keyword2, Response FROM perplexity
+                WHERE Response IS NOT NULL AND Response != ''
+            """)
+        # Merge the b-tree segments so queries touch as few pages as possible
+        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return conn.execute(f"SELECT count(*) FROM {FTS_TABLE}").fetchone()[0]
+
+
+def to_match_expression(text):
+    # Quote every term so user input can never be parsed as FTS5 syntax.
+    # "double quoted" parts stay phrases; bare words are ANDed together.
+    terms = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', text):
+        term = (phrase or word).replace('"', '""')
+        if term.strip():
+            terms.append(f'"{term}"')
+    return " ".join(terms)
+
+
+def search_responses(db_path, text, limit=20):
+    """Return the best-matching responses for ``text``, best first."""
+    columns = ["Source", "Keyword1", "Keyword2", "Snippet", "Rank"]
+    expression = to_match_expression(text)
+    if not expression:
+        return pd.DataFrame(columns=columns)
+    with db_connection(db_path) as conn:
+        try:
+            return pd.read_sql_query(SEARCH_QUERY, conn, params=(expression, limit))
+        except (sqlite3.OperationalError, pd.errors.DatabaseError):
+            # Index not built yet
+            return pd.DataFrame(columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the full-text index over screen responses.")
+    parser.add_argument("db_path")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        count = rebuild_index(conn)
+    finally:
+        conn.close()
+    print(f"Indexed {count} responses into {FTS_TABLE}")
+
+
+if __name__ == "__main__":
+    main()
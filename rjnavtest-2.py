@@ -1,5 +1,6 @@
 import streamlit as st
-import sqlite3
+from db_pool import db_connection
+from refdata import get_snapshot
 import pandas as pd
 import yfinance as yf
 import plotly.graph_objects as go
@@ -54,38 +55,24 @@ with st.sidebar:
 # Database connection
 DB_PATH = "/Users/davidscatterday/Documents/python projects/NYC/nycprocurement.db"
 
-def get_sector_data(sector):
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT Sector, Description, Primary_Subsector, Subsector_Weight, Harm_Magnitude, Population_Impact, Directional_Movement, Total_Score
-    FROM stockracialharm
-    WHERE Sector LIKE ?
-    """
-    df = pd.read_sql_query(query, conn, params=(f"%{sector}%",))
-    conn.close()
-    return df
+def get_sector_data(sectors):
+    return get_snapshot(DB_PATH).sector_frame(sectors)
 
 def get_all_sectors():
-    conn = sqlite3.connect(DB_PATH)
-    query = "SELECT DISTINCT Sector FROM stockracialharm"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df['Sector'].tolist()
+    return list(get_snapshot(DB_PATH).sectors)
 
 def get_unique_values(column_name):
-    conn = sqlite3.connect(DB_PATH)
-    query = f"SELECT DISTINCT {column_name} FROM adasina WHERE {column_name} IS NOT NULL AND {column_name} != ''"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df[column_name].tolist()
+    return list(get_snapshot(DB_PATH).facets[column_name])
+
+def get_screens(subindustry):
+    return list(get_snapshot(DB_PATH).facet_index.screens_for(subindustry))
 
 def get_response(keyword1, keyword2):
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT Response FROM adasina WHERE Keyword1 = ? AND Keyword2 = ? LIMIT 1
-    """
-    df = pd.read_sql_query(query, conn, params=(keyword1, keyword2))
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        query = """
+        SELECT Response FROM adasina WHERE Keyword1 = ? AND Keyword2 = ? LIMIT 1
+        """
+        df = pd.read_sql_query(query, conn, params=(keyword1, keyword2))
     return df['Response'].iloc[0] if not df.empty else "No matching response found."
 
 # Format market cap and enterprise value
@@ -102,7 +89,6 @@ all_sectors = get_all_sectors()
 
 # Get unique values for dropdowns
 subindustries = get_unique_values("Keyword1")
-social_justice_screens = get_unique_values("Keyword2")
 
 # Sidebar for user inputs
 with st.sidebar:
@@ -113,6 +99,8 @@ with st.sidebar:
     
     st.markdown("<h4 style='font-size: 18px;'>Social Justice Screen</h4>", unsafe_allow_html=True)
     subindustry = st.selectbox("Subindustry:", [""] + subindustries)
+    # Only offer screens that have a response for the chosen subindustry
+    social_justice_screens = get_screens(subindustry)
     social_justice_screen = st.selectbox("Social Justice Screen:", [""] + social_justice_screens)
     
     submit_button = st.button("Search")
@@ -257,23 +245,12 @@ if submit_button:
                    
                     st.markdown(f"<h3 style='text-align: center;'>Harm Magnitude</h3>", unsafe_allow_html=True)
 
-                    # Function to get Harm-Magnitude content from stockharmdef2
-                    def get_harm_magnitude_content(key):
-                        conn = sqlite3.connect(DB_PATH)
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT \"Harm-Magnitude\" FROM stockharmdef2 WHERE Key = ?", (key,))
-                        result = cursor.fetchone()
-                        conn.close()
-                        if result:
-                            return result[0]
-                        return "Not found"
-
                     # Display the integer from the "Harm_Magnitude" column in the "stockracialharm" table
                     harm_magnitude_key = row['Harm_Magnitude']
                     st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{harm_magnitude_key}</p>", unsafe_allow_html=True)
 
                     # Get and display the content from the "Harm-Magnitude" column in the stockharmdef2 table
-                    harm_magnitude_content = get_harm_magnitude_content(harm_magnitude_key)
+                    harm_magnitude_content = row['Harm_Magnitude_Content']
                     
                     with st.expander("See explanation"):
                         st.write(harm_magnitude_content)
@@ -281,23 +258,12 @@ if submit_button:
 
                     st.markdown(f"<h3 style='text-align: center;'>Population Impact</h3>", unsafe_allow_html=True)
 
-                    # Function to get Population Impact content from stockharmdef2
-                    def get_pop_impact_content(key):
-                        conn = sqlite3.connect(DB_PATH)
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT \"Pop-Impact\" FROM stockharmdef2 WHERE Key = ?", (key,))
-                        result = cursor.fetchone()
-                        conn.close()
-                        if result:
-                            return result[0]
-                        return "Not found"
-
                     # Display the integer from the "Pop-Impact" column in the "stockracialharm" table
                     pop_impact_key = row['Population_Impact']
                     st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{pop_impact_key}</p>", unsafe_allow_html=True)
 
                     # Get and display the content from the "Harm-Magnitude" column in the stockharmdef2 table
-                    pop_impact_content = get_pop_impact_content(pop_impact_key)
+                    pop_impact_content = row['Population_Impact_Content']
                     
                     with st.expander("See explanation"):
                         st.write(pop_impact_content)    
@@ -305,23 +271,12 @@ if submit_button:
 
                     st.markdown(f"<h3 style='text-align: center;'>Directional Movement</h3>", unsafe_allow_html=True)
                     
-                    # Function to get Directional Movement content from stockharmdef2
-                    def get_directional_trend_content(key):
-                        conn = sqlite3.connect(DB_PATH)
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT \"Directional-Trend\" FROM stockharmdef2 WHERE Key = ?", (key,))
-                        result = cursor.fetchone()
-                        conn.close()
-                        if result:
-                            return result[0]
-                        return "Not found"
-
                     # Display the integer from the "Directional Impact" column in the "stockracialharm" table
                     directional_movement_key = row['Directional_Movement']
                     st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{directional_movement_key}</p>", unsafe_allow_html=True)
 
                     # Get and display the content from the "Harm-Magnitude" column in the stockharmdef2 table
-                    directional_movement_content = get_directional_trend_content(directional_movement_key)
+                    directional_movement_content = row['Directional_Movement_Content']
                     
                     with st.expander("See explanation"):
                         st.write(directional_movement_content)  
@@ -1,7 +1,18 @@
 import streamlit as st
-import sqlite3
+from db_pool import db_connection
+from downsample import downsample, points_for_width
+from fetch_pool import fetch_concurrently
+from fundamentals_cache import get_info
+from indicators import indicators_for
+from portfolio import portfolio_harm, read_holdings
+from prefetch import start_prefetcher
+from price_history import get_history
+from proxy_store import query_proxy
+from rate_limit import UpstreamThrottled
+from refdata import get_snapshot
+from response_search import search_responses
+from sector_resolver import get_index, resolve_ticker
 import pandas as pd
-import yfinance as yf
 import plotly.graph_objects as go
 from PIL import Image
 import os
@@ -10,6 +21,7 @@ from io import BytesIO
 import tempfile
 import datetime
 import pytz
+from functools import partial
 
 # Set page configuration
 st.set_page_config(page_title="Financial Analysis Dashboard", layout="wide")
@@ -54,51 +66,46 @@ with st.sidebar:
 # Database connection
 DB_PATH = "/Users/davidscatterday/Documents/python projects/NYC/nycprocurement.db"
 
-def get_sector_data(sector):
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT Sector, Description, Primary_Subsector, Subsector_Weight, Harm_Magnitude, Population_Impact, Directional_Movement, Total_Score, Normalized_Score_1, Normalized_Score_2
-    FROM stockracialharm
-    WHERE Sector LIKE ?
-    """
-    df = pd.read_sql_query(query, conn, params=(f"%{sector}%",))
-    conn.close()
-    return df
+def get_sector_data(sectors):
+    return get_snapshot(DB_PATH).sector_frame(sectors)
 
 def get_all_sectors():
-    conn = sqlite3.connect(DB_PATH)
-    query = "SELECT DISTINCT Sector FROM stockracialharm"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df['Sector'].tolist()
+    return list(get_snapshot(DB_PATH).sectors)
 
 def get_unique_values(column_name):
-    conn = sqlite3.connect(DB_PATH)
-    query = f"SELECT DISTINCT {column_name} FROM adasina WHERE {column_name} IS NOT NULL AND {column_name} != ''"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df[column_name].tolist()
+    return list(get_snapshot(DB_PATH).facets[column_name])
+
+def get_screens(subindustry):
+    return list(get_snapshot(DB_PATH).facet_index.screens_for(subindustry))
 
 def get_response(keyword1, keyword2):
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT Response FROM adasina WHERE Keyword1 = ? AND Keyword2 = ? LIMIT 1
-    """
-    df = pd.read_sql_query(query, conn, params=(keyword1, keyword2))
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        query = """
+        SELECT Response FROM adasina WHERE Keyword1 = ? AND Keyword2 = ? LIMIT 1
+        """
+        df = pd.read_sql_query(query, conn, params=(keyword1, keyword2))
     return df['Response'].iloc[0] if not df.empty else "No matching response found."
 
 def get_asyousow_data(sector):
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-    SELECT a.*
-    FROM asyousowrj a
-    JOIN stockracialharm s ON a.Sector = s.Sector
-    WHERE s.Sector LIKE ?
-    """
-    df = pd.read_sql_query(query, conn, params=(f"%{sector}%",))
-    conn.close()
-    return df
+    # As You Sow spells some sectors differently ("Communiciations Services")
+    return sector, get_index(DB_PATH).asyousow_frame(sector)
+
+def get_ticker_sector_data(ticker):
+    match = resolve_ticker(ticker, DB_PATH)
+    if match is None:
+        return get_sector_data([])
+    results = get_sector_data(match.sector)
+    return results[results['Primary_Subsector'].str.strip() == match.subsector]
+
+def get_ticker_asyousow_data(ticker):
+    match = resolve_ticker(ticker, DB_PATH)
+    return get_asyousow_data(match.sector) if match else (None, get_snapshot(DB_PATH).asyousow_frame([]))
+
+THROTTLED_MESSAGE = "The market data provider is rate limiting requests right now. Please search again in a minute."
+
+# Widest the price chart gets in the wide layout, and the width the PDF chart is rendered at
+CHART_WIDTH_PX = 1200
+PDF_CHART_WIDTH_PX = 700
 
 # Format market cap and enterprise value
 def format_value(value):
@@ -109,30 +116,50 @@ def format_value(value):
         suffix_index += 1
     return f"${value:.1f}{suffixes[suffix_index]}"
 
+# Keep the watchlist's market data warm between searches (starts once per server process)
+start_prefetcher()
+
 # Get all available sectors
 all_sectors = get_all_sectors()
 
 # Get unique values for dropdowns
 subindustries = get_unique_values("Keyword1")
-social_justice_screens = get_unique_values("Keyword2")
 
 # Sidebar for user inputs
 with st.sidebar:
     st.markdown("<h4 style='font-size: 18px;'>Public Equity Search</h4>", unsafe_allow_html=True)
     ticker = st.text_input("Enter a stock ticker (e.g. MSFT)", "")
-    sector_search = st.selectbox("Select industry sector:", [""] + all_sectors)
+    sector_search = st.selectbox("Select industry sector (blank uses the ticker's sector):", [""] + all_sectors)
     period = st.selectbox("Enter a timeframe", ("1D", "5D", "1M", "6M", "YTD", "1Y", "5Y"), index=2)
     
     st.markdown("<h4 style='font-size: 18px;'>Social Justice Screen</h4>", unsafe_allow_html=True)
     subindustry = st.selectbox("Subindustry:", [""] + subindustries)
+    # Only offer screens that have a response for the chosen subindustry
+    social_justice_screens = get_screens(subindustry)
     social_justice_screen = st.selectbox("Social Justice Screen:", [""] + social_justice_screens)
+    response_search_text = st.text_input("Search screen responses (e.g. prison labor)", "")
     
     submit_button = st.button("Search")
 
+    st.markdown("<h4 style='font-size: 18px;'>Portfolio Racial Harm Exposure</h4>", unsafe_allow_html=True)
+    portfolio_button = st.button("Analyze Portfolio Holdings")
+
 # Main content area
 st.markdown("<h2 style='font-size: 32px;'>Racial Justice Investment Intelligence Dashboard</h2>", unsafe_allow_html=True)
 st.divider()
 
+# Full-text search across all screen responses
+if response_search_text:
+    st.subheader("Screen Response Search")
+    matches = search_responses(DB_PATH, response_search_text)
+    if not matches.empty:
+        for index, match in matches.iterrows():
+            st.markdown(f"**{match['Keyword1']} / {match['Keyword2']}** ({match['Source']})")
+            st.markdown(match['Snippet'])
+    else:
+        st.info(f"No screen responses match: {response_search_text}")
+    st.divider()
+
 # Function to create PDF
 def create_pdf():
     pdf = FPDF()
@@ -144,15 +171,16 @@ def create_pdf():
     
     # Add stock price chart
     if not history.empty and 'Close' in history.columns:
+        close = downsample(history['Close'], points_for_width(PDF_CHART_WIDTH_PX))
         fig = go.Figure()
-        fig.add_trace(go.Scatter(x=history.index, y=history['Close'], mode='lines', name='Close Price'))
+        fig.add_trace(go.Scatter(x=close.index, y=close, mode='lines', name='Close Price'))
         fig.update_layout(
             title=f'{ticker} Stock Price',
             xaxis_title='Date',
             yaxis_title='Price',
             template='plotly_white'
         )
-        img_bytes = fig.to_image(format="png")
+        img_bytes = fig.to_image(format="png", width=PDF_CHART_WIDTH_PX)
         
         # Convert bytes to PIL Image
         img = Image.open(BytesIO(img_bytes))
@@ -172,193 +200,255 @@ def create_pdf():
 
     return pdf.output(dest='S').encode('latin-1')
 
+PROXY_VOTE_COLUMNS = ["Meeting_Date", "Proposal_Type_General", "Proposal_Type_Specific", "Title", "Proponent", "Votes_For"]
+
+def show_stock_data(info, history):
+    st.subheader(f"{ticker} - {info.get('longName', 'N/A')}")
+
+    # Plot historical stock price data
+    if not history.empty:
+        if 'Close' in history.columns:
+            # One point per pixel is all the chart can show, whatever the period
+            close = downsample(history['Close'], points_for_width(CHART_WIDTH_PX))
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=close.index, y=close, mode='lines', name='Close Price'))
+            fig.update_layout(
+                title=f'{ticker} Stock Price',
+                xaxis_title='Date',
+                yaxis_title='Price',
+                template='plotly_white'
+            )
+            st.plotly_chart(fig)
+        else:
+            st.error("'Close' price data not found in the retrieved history.")
+            st.write("Available columns:", history.columns.tolist())
+    else:
+        st.warning("No historical data available for the selected period.")
+
+    # Display raw data for debugging
+    st.subheader("Raw Data (First 5 rows)")
+    st.dataframe(history.head(), use_container_width=True)
+
+    col1, col2, col3 = st.columns(3)
+
+    # Stock Info
+    stock_info = [
+        ("Stock Info", "Value"),
+        ("Country", info.get('country', 'N/A')),
+        ("Sector", info.get('sector', 'N/A')),
+        ("Industry", info.get('industry', 'N/A')),
+        ("Market Cap", format_value(info.get('marketCap', 'N/A'))),
+        ("Enterprise Value", format_value(info.get('enterpriseValue', 'N/A'))),
+        ("Employees", info.get('fullTimeEmployees', 'N/A'))
+    ]
+    df = pd.DataFrame(stock_info[1:], columns=stock_info[0])
+    col1.dataframe(df, width=400, hide_index=True)
+
+    # Price Info
+    price_info = [
+        ("Price Info", "Value"),
+        ("Current Price", f"${info.get('currentPrice', 'N/A'):.2f}"),
+        ("Previous Close", f"${info.get('previousClose', 'N/A'):.2f}"),
+        ("Day High", f"${info.get('dayHigh', 'N/A'):.2f}"),
+        ("Day Low", f"${info.get('dayLow', 'N/A'):.2f}"),
+        ("52 Week High", f"${info.get('fiftyTwoWeekHigh', 'N/A'):.2f}"),
+        ("52 Week Low", f"${info.get('fiftyTwoWeekLow', 'N/A'):.2f}")
+    ]
+    df = pd.DataFrame(price_info[1:], columns=price_info[0])
+    col2.dataframe(df, width=400, hide_index=True)
+
+    # Business Metrics
+    biz_metrics = [
+        ("Business Metrics", "Value"),
+        ("EPS (FWD)", f"{info.get('forwardEps', 'N/A'):.2f}"),
+        ("P/E (FWD)", f"{info.get('forwardPE', 'N/A'):.2f}"),
+        ("PEG Ratio", f"{info.get('pegRatio', 'N/A'):.2f}"),
+        ("Div Rate (FWD)", f"${info.get('dividendRate', 'N/A'):.2f}"),
+        ("Div Yield (FWD)", f"{info.get('dividendYield', 'N/A') * 100:.2f}%"),
+        ("Recommendation", info.get('recommendationKey', 'N/A').capitalize())
+    ]
+    df = pd.DataFrame(biz_metrics[1:], columns=biz_metrics[0])
+    col3.dataframe(df, width=400, hide_index=True)
+
+def show_indicators(result):
+    indicators, errors = result
+    if indicators.empty:
+        st.info(f"Not enough price history to compute performance metrics for {ticker}.")
+        return
+    row = indicators.iloc[0]
+    performance = [
+        ("Performance & Risk", "Value"),
+        ("Return 1M", f"{row['Return 1M'] * 100:.2f}%"),
+        ("Return 6M", f"{row['Return 6M'] * 100:.2f}%"),
+        ("Return YTD", f"{row['Return YTD'] * 100:.2f}%"),
+        ("Return 1Y", f"{row['Return 1Y'] * 100:.2f}%"),
+        ("Return 5Y", f"{row['Return 5Y'] * 100:.2f}%"),
+        ("Volatility (Ann.)", f"{row['Volatility (Ann.)'] * 100:.2f}%"),
+        ("Max Drawdown (1Y)", f"{row['Max Drawdown 1Y'] * 100:.2f}%"),
+        ("Beta (vs SPY)", f"{row['Beta']:.2f}"),
+        ("50-Day MA", f"${row['MA 50']:.2f}"),
+        ("200-Day MA", f"${row['MA 200']:.2f}")
+    ]
+    df = pd.DataFrame(performance[1:], columns=performance[0])
+    st.dataframe(df, width=400, hide_index=True)
+
+def show_sector_data(results):
+    if not results.empty:
+        for index, row in results.iterrows():
+            st.markdown(f"Details for {row['Sector']}:")
+            st.markdown(f"**Description:** {row['Description']}")
+            st.markdown(f"**Primary Subsector:** {row['Primary_Subsector']}")
+            st.markdown(f"**Subsector Weight:** {row['Subsector_Weight']}")
+
+           
+            st.markdown(f"<h3 style='text-align: center;'>Harm Magnitude</h3>", unsafe_allow_html=True)
+
+            # Display the integer from the "Harm_Magnitude" column in the "stockracialharm" table
+            harm_magnitude_key = row['Harm_Magnitude']
+            st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{harm_magnitude_key}</p>", unsafe_allow_html=True)
+
+            # Get and display the content from the "Harm-Magnitude" column in the stockharmdef2 table
+            harm_magnitude_content = row['Harm_Magnitude_Content']
+            
+            with st.expander("See explanation"):
+                st.write(harm_magnitude_content)
+
+
+            st.markdown(f"<h3 style='text-align: center;'>Population Impact</h3>", unsafe_allow_html=True)
+
+            # Display the integer from the "Pop-Impact" column in the "stockracialharm" table
+            pop_impact_key = row['Population_Impact']
+            st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{pop_impact_key}</p>", unsafe_allow_html=True)
+
+            # Get and display the content from the "Harm-Magnitude" column in the stockharmdef2 table
+            pop_impact_content = row['Population_Impact_Content']
+            
+            with st.expander("See explanation"):
+                st.write(pop_impact_content)    
+
+
+            st.markdown(f"<h3 style='text-align: center;'>Directional Movement</h3>", unsafe_allow_html=True)
+            
+            # Display the integer from the "Directional Impact" column in the "stockracialharm" table
+            directional_movement_key = row['Directional_Movement']
+            st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{directional_movement_key}</p>", unsafe_allow_html=True)
+
+            # Get and display the content from the "Harm-Magnitude" column in the stockharmdef2 table
+            directional_movement_content = row['Directional_Movement_Content']
+            
+            with st.expander("See explanation"):
+                st.write(directional_movement_content)  
+            
+            
+
+            st.markdown(f"<h3 style='text-align: center;'>Total Score</h3>", unsafe_allow_html=True)
+            st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{row['Normalized_Score_2']}</p>", unsafe_allow_html=True)
+            st.markdown(f"**Weighted Score:** {row['Weighted_Score']:g} (Total Score x Subsector Weight)")
+            if row['Score_Mismatch']:
+                st.warning(f"The recorded score {row['Normalized_Score_2']:g} differs from the score derived from "
+                           f"its component ratings ({row['Derived_Score']:g}).")
+            with st.expander("See explanation"):
+                st.write(row['Score_Explanation'])
+    else:
+        st.info(f"No racial harm data found for {sector_search or ticker}. Select a sector in the sidebar to see it.")
+
+def show_screen_response(response):
+    st.write(f"**Subindustry:** {subindustry}")
+    st.write(f"**Social Justice Screen:** {social_justice_screen}")
+    st.write("**Response:**")
+    st.write(response)
+
+def show_asyousow_data(result):
+    sector, asyousow_data = result
+    if not asyousow_data.empty:
+        st.write(f"Insights for sector: {sector}")
+        st.dataframe(asyousow_data, use_container_width=True)  # Modified 
+    elif sector is None:
+        st.info(f"Could not match {ticker} to an industry sector. Select one in the sidebar to see As You Sow insights.")
+    else:
+        st.info(f"No As You Sow data found for the sector: {sector}")
+
+def show_proxy_votes(proxy_votes):
+    if proxy_votes is None:
+        st.info("Proxy voting data has not been loaded yet.")
+    elif not proxy_votes.empty:
+        st.dataframe(proxy_votes.sort_values("Meeting_Date", ascending=False), use_container_width=True, hide_index=True)
+    else:
+        st.info(f"No proxy proposals found for {ticker}.")
+
+def show_portfolio_harm(result):
+    total = result.total
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Portfolio Value", format_value(total['Market_Value']))
+    col2.metric("Exposure-Weighted Score", f"{total['Normalized_Score_2']:.1f}")
+    col3.metric("Value Scored", f"{total['Scored_Weight'] * 100:.0f}%")
+    st.write(total['Score_Explanation'])
+    by_sector = result.by_sector.assign(Weight=result.by_sector['Weight'] * 100)
+    st.dataframe(
+        by_sector,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Market_Value": st.column_config.NumberColumn("Market Value", format="$%.2f"),
+            "Weight": st.column_config.NumberColumn("Weight", format="%.1f%%"),
+        },
+    )
+    with st.expander("Holdings"):
+        st.dataframe(result.holdings, use_container_width=True, hide_index=True)
+    for symbol, message in result.errors.items():
+        st.warning(f"Lookup failed for {symbol}: {message}")
+
+if portfolio_button:
+    st.subheader("Portfolio Racial Harm Exposure")
+    try:
+        with st.spinner("Valuing holdings..."):
+            show_portfolio_harm(portfolio_harm(read_holdings(), DB_PATH))
+    except UpstreamThrottled:
+        st.warning("The market data provider is rate limiting requests right now. Please try again in a minute.")
+    except Exception as e:
+        st.exception(f"An error occurred while analyzing the portfolio: {e}")
+    st.divider()
+
 # Add this new block to display the message when no search has been performed
-if not submit_button:
+if not submit_button and not portfolio_button:
     st.info("Please enter search values in the left sidebar to begin.")
 
 if submit_button:
-    if not ticker or not sector_search:
-        st.error("Please provide both a stock ticker and select a sector to search.")
+    if not ticker:
+        st.error("Please provide a stock ticker to search.")
     else:
+        # None of these lookups depend on each other: start them all now and
+        # fill in each section below as soon as its own data arrives. Without a
+        # sector picked, the sector sections resolve it from the ticker.
+        tasks = {
+            "info": partial(get_info, ticker),
+            "history": partial(get_history, ticker, period),
+            "indicators": partial(indicators_for, ticker),
+            "sector": partial(get_sector_data, sector_search) if sector_search else partial(get_ticker_sector_data, ticker),
+            "asyousow": partial(get_asyousow_data, sector_search) if sector_search else partial(get_ticker_asyousow_data, ticker),
+            "proxy": partial(query_proxy, symbol=ticker, columns=PROXY_VOTE_COLUMNS),
+        }
+        if subindustry and social_justice_screen:
+            tasks["response"] = partial(get_response, subindustry, social_justice_screen)
+
         # Stock Market Data
-        try:
-            with st.spinner('Fetching stock data...'):
-                stock = yf.Ticker(ticker)
-                info = stock.info
-                st.subheader(f"{ticker} - {info.get('longName', 'N/A')}")
-
-                # Plot historical stock price data
-                history = stock.history(period=period)
-                if not history.empty:
-                    if 'Close' in history.columns:
-                        fig = go.Figure()
-                        fig.add_trace(go.Scatter(x=history.index, y=history['Close'], mode='lines', name='Close Price'))
-                        fig.update_layout(
-                            title=f'{ticker} Stock Price',
-                            xaxis_title='Date',
-                            yaxis_title='Price',
-                            template='plotly_white'
-                        )
-                        st.plotly_chart(fig)
-                    else:
-                        st.error("'Close' price data not found in the retrieved history.")
-                        st.write("Available columns:", history.columns.tolist())
-                else:
-                    st.warning("No historical data available for the selected period.")
-
-                # Display raw data for debugging
-                st.subheader("Raw Data (First 5 rows)")
-                st.dataframe(history.head(), use_container_width=True)
-
-                col1, col2, col3 = st.columns(3)
-
-                # Stock Info
-                stock_info = [
-                    ("Stock Info", "Value"),
-                    ("Country", info.get('country', 'N/A')),
-                    ("Sector", info.get('sector', 'N/A')),
-                    ("Industry", info.get('industry', 'N/A')),
-                    ("Market Cap", format_value(info.get('marketCap', 'N/A'))),
-                    ("Enterprise Value", format_value(info.get('enterpriseValue', 'N/A'))),
-                    ("Employees", info.get('fullTimeEmployees', 'N/A'))
-                ]
-                df = pd.DataFrame(stock_info[1:], columns=stock_info[0])
-                col1.dataframe(df, width=400, hide_index=True)
-
-                # Price Info
-                price_info = [
-                    ("Price Info", "Value"),
-                    ("Current Price", f"${info.get('currentPrice', 'N/A'):.2f}"),
-                    ("Previous Close", f"${info.get('previousClose', 'N/A'):.2f}"),
-                    ("Day High", f"${info.get('dayHigh', 'N/A'):.2f}"),
-                    ("Day Low", f"${info.get('dayLow', 'N/A'):.2f}"),
-                    ("52 Week High", f"${info.get('fiftyTwoWeekHigh', 'N/A'):.2f}"),
-                    ("52 Week Low", f"${info.get('fiftyTwoWeekLow', 'N/A'):.2f}")
-                ]
-                df = pd.DataFrame(price_info[1:], columns=price_info[0])
-                col2.dataframe(df, width=400, hide_index=True)
-
-                # Business Metrics
-                biz_metrics = [
-                    ("Business Metrics", "Value"),
-                    ("EPS (FWD)", f"{info.get('forwardEps', 'N/A'):.2f}"),
-                    ("P/E (FWD)", f"{info.get('forwardPE', 'N/A'):.2f}"),
-                    ("PEG Ratio", f"{info.get('pegRatio', 'N/A'):.2f}"),
-                    ("Div Rate (FWD)", f"${info.get('dividendRate', 'N/A'):.2f}"),
-                    ("Div Yield (FWD)", f"{info.get('dividendYield', 'N/A') * 100:.2f}%"),
-                    ("Recommendation", info.get('recommendationKey', 'N/A').capitalize())
-                ]
-                df = pd.DataFrame(biz_metrics[1:], columns=biz_metrics[0])
-                col3.dataframe(df, width=400, hide_index=True)
-
-        except Exception as e:
-            st.exception(f"An error occurred while fetching stock data: {e}")
+        stock_section = st.empty()
+        stock_section.info("Fetching stock data...")
+        indicators_section = st.empty()
 
         st.divider()
         # Stock Racial Harm Data
         st.subheader("Industry Sector Racial Harm Metrics")
-        with st.spinner('Fetching sector data...'):
-            results = get_sector_data(sector_search)
-            if not results.empty:
-                for index, row in results.iterrows():
-                    st.markdown(f"Details for {row['Sector']}:")
-                    st.markdown(f"**Description:** {row['Description']}")
-                    st.markdown(f"**Primary Subsector:** {row['Primary_Subsector']}")
-                    st.markdown(f"**Subsector Weight:** {row['Subsector_Weight']}")
-
-                   
-                    st.markdown(f"<h3 style='text-align: center;'>Harm Magnitude</h3>", unsafe_allow_html=True)
-
-                    # Function to get Harm-Magnitude content from stockharmdef2
-                    def get_harm_magnitude_content(key):
-                        conn = sqlite3.connect(DB_PATH)
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT \"Harm-Magnitude\" FROM stockharmdef2 WHERE Key = ?", (key,))
-                        result = cursor.fetchone()
-                        conn.close()
-                        if result:
-                            return result[0]
-                        return "Not found"
-
-                    # Display the integer from the "Harm_Magnitude" column in the "stockracialharm" table
-                    harm_magnitude_key = row['Harm_Magnitude']
-                    st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{harm_magnitude_key}</p>", unsafe_allow_html=True)
-
-                    # Get and display the content from the "Harm-Magnitude" column in the stockharmdef2 table
-                    harm_magnitude_content = get_harm_magnitude_content(harm_magnitude_key)
-                    
-                    with st.expander("See explanation"):
-                        st.write(harm_magnitude_content)
-
-
-                    st.markdown(f"<h3 style='text-align: center;'>Population Impact</h3>", unsafe_allow_html=True)
-
-                    # Function to get Population Impact content from stockharmdef2
-                    def get_pop_impact_content(key):
-                        conn = sqlite3.connect(DB_PATH)
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT \"Pop-Impact\" FROM stockharmdef2 WHERE Key = ?", (key,))
-                        result = cursor.fetchone()
-                        conn.close()
-                        if result:
-                            return result[0]
-                        return "Not found"
-
-                    # Display the integer from the "Pop-Impact" column in the "stockracialharm" table
-                    pop_impact_key = row['Population_Impact']
-                    st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{pop_impact_key}</p>", unsafe_allow_html=True)
-
-                    # Get and display the content from the "Harm-Magnitude" column in the stockharmdef2 table
-                    pop_impact_content = get_pop_impact_content(pop_impact_key)
-                    
-                    with st.expander("See explanation"):
-                        st.write(pop_impact_content)    
-
-
-                    st.markdown(f"<h3 style='text-align: center;'>Directional Movement</h3>", unsafe_allow_html=True)
-                    
-                    # Function to get Directional Movement content from stockharmdef2
-                    def get_directional_trend_content(key):
-                        conn = sqlite3.connect(DB_PATH)
-                        cursor = conn.cursor()
-                        cursor.execute("SELECT \"Directional-Trend\" FROM stockharmdef2 WHERE Key = ?", (key,))
-                        result = cursor.fetchone()
-                        conn.close()
-                        if result:
-                            return result[0]
-                        return "Not found"
-
-                    # Display the integer from the "Directional Impact" column in the "stockracialharm" table
-                    directional_movement_key = row['Directional_Movement']
-                    st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{directional_movement_key}</p>", unsafe_allow_html=True)
-
-                    # Get and display the content from the "Harm-Magnitude" column in the stockharmdef2 table
-                    directional_movement_content = get_directional_trend_content(directional_movement_key)
-                    
-                    with st.expander("See explanation"):
-                        st.write(directional_movement_content)  
-                    
-                    
-
-                    st.markdown(f"<h3 style='text-align: center;'>Total Score</h3>", unsafe_allow_html=True)
-                    st.markdown(f"<p style='font-size: 24px; font-weight: bold; text-align: center;'>{row['Normalized_Score_2']}</p>", unsafe_allow_html=True)
-                    with st.expander("See explanation"):
-                        st.write('''
-                            This score corresponds with the second lowest quintile of recorded scores and indicates a "strong" profile of racial harm present in typical industry lifecycle activities.
-                        ''')
+        sector_section = st.empty()
+        sector_section.info("Fetching sector data...")
 
         st.divider()
 
         # New section for Social Justice Screen results
         st.subheader("Social Justice Screen Results")
-        if subindustry and social_justice_screen:
-            response = get_response(subindustry, social_justice_screen)
-            st.write(f"**Subindustry:** {subindustry}")
-            st.write(f"**Social Justice Screen:** {social_justice_screen}")
-            st.write("**Response:**")
-            st.write(response)
-        else:
-            st.info("Please select both Subindustry and Social Justice Screen to see results.")
+        screen_section = st.empty()
+        if "response" not in tasks:
+            screen_section.info("Please select both Subindustry and Social Justice Screen to see results.")
 
         # Add a line space
         st.markdown("<br>", unsafe_allow_html=True)
@@ -372,16 +462,51 @@ if submit_button:
 
         # As You Sow Sector Insights
         st.subheader("As You Sow Sector Insights")
-        if sector_search:
-            asyousow_data = get_asyousow_data(sector_search)
-    
-            if not asyousow_data.empty:
-                st.write(f"Insights for sector: {sector_search}")
-                st.dataframe(asyousow_data, use_container_width=True)  # Modified 
-            else:
-                st.info(f"No As You Sow data found for the sector: {sector_search}")
-        else:
-            st.info("Please select an industry sector to see As You Sow insights.")
+        asyousow_section = st.empty()
+
+        st.divider()
+
+        # Proxy voting record for the searched ticker
+        st.subheader("Proxy Voting Record")
+        proxy_section = st.empty()
+
+        sections = {
+            "indicators": (indicators_section, show_indicators),
+            "sector": (sector_section, show_sector_data),
+            "response": (screen_section, show_screen_response),
+            "asyousow": (asyousow_section, show_asyousow_data),
+            "proxy": (proxy_section, show_proxy_votes),
+        }
+        # create_pdf() reads these once the stock data is in
+        info, history = {}, pd.DataFrame()
+        stock_data = {}
+        for name, result, error in fetch_concurrently(tasks):
+            if name in ("info", "history"):
+                stock_data[name] = (result, error)
+                if len(stock_data) < 2:
+                    continue
+                (info_result, info_error), (history_result, history_error) = stock_data["info"], stock_data["history"]
+                with stock_section.container():
+                    try:
+                        if info_error or history_error:
+                            raise info_error or history_error
+                        info, history = info_result, history_result
+                        show_stock_data(info, history)
+                    except UpstreamThrottled:
+                        st.warning(THROTTLED_MESSAGE)
+                    except Exception as e:
+                        st.exception(f"An error occurred while fetching stock data: {e}")
+                continue
+
+            section, show = sections[name]
+            with section.container():
+                # The sector sections look the ticker up upstream when no sector was picked
+                if isinstance(error, UpstreamThrottled):
+                    st.warning(THROTTLED_MESSAGE)
+                elif error is not None:
+                    st.exception(error)
+                else:
+                    show(result)
 
         # Add a line space
         st.markdown("<br>", unsafe_allow_html=True)
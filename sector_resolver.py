@@ -0,0 +1,202 @@
+"""Resolve tickers and provider sector names to stockracialharm sectors.
+
+The harm table uses the GICS names from before the 2018 reshuffle
+("Telecommunication Services"), yfinance reports Morningstar sectors
+("Technology", "Consumer Cyclical") and Asyousow-RacialJustice.csv has its own
+spellings ("Communiciations Services"). SectorIndex maps any of these to a
+stockracialharm Sector and Primary_Subsector, trying in order:
+
+1. INDUSTRY_SECTORS, for the few provider industries GICS files elsewhere,
+2. the normalized name itself, then SECTOR_ALIASES,
+3. the closest known name (difflib), which catches misspellings.
+
+Each name is resolved once and each ticker's match is kept, so the Search page
+can look up sector data alongside the market data without asking for a sector.
+
+    python sector_resolver.py "/path/to/nycprocurement.db" AAPL F "Communiciations Services"
+"""
+import argparse
+import difflib
+import threading
+from collections import namedtuple
+from functools import partial
+
+from db_migrations import normalize_sector
+from fetch_pool import fetch_concurrently
+from fundamentals_cache import get_info
+from refdata import get_snapshot
+
+# Normalized provider/GICS/source spelling -> stockracialharm Sector
+SECTOR_ALIASES = {
+    # GICS since 2018
+    "communication services": "Telecommunication Services",
+    "telecommunications services": "Telecommunication Services",
+    "telecommunication": "Telecommunication Services",
+    # yfinance (Morningstar) sectors
+    "technology": "Information Technology",
+    "consumer cyclical": "Consumer Discretionary",
+    "consumer defensive": "Consumer Staples",
+    "healthcare": "Health Care",
+    "financial services": "Financials",
+    "basic materials": "Materials",
+    # Asyousow-RacialJustice.csv
+    "communiciations services": "Telecommunication Services",
+    "real estate investment trust": "Real Estate",
+}
+
+# yfinance industries whose GICS sector differs from the yfinance sector
+INDUSTRY_SECTORS = {
+    "packaging & containers": "Materials",
+    "education & training services": "Consumer Discretionary",
+    "reit - mortgage": "Financials",
+}
+
+FUZZY_CUTOFF = 0.85
+SUBSECTOR_CUTOFF = 0.6
+
+SectorMatch = namedtuple("SectorMatch", ["sector", "subsector", "source"])
+
+
+class SectorIndex:
+    """Name and ticker lookups against one RefSnapshot's sectors."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        columns = snapshot.sector_columns
+        subsector_at, weight_at = columns.index("Primary_Subsector"), columns.index("Subsector_Weight")
+        self.sectors = {normalize_sector(sector): sector for sector in snapshot.sectors}
+        # Subsectors of each sector, heaviest first
+        self.subsectors = {
+            key: [str(row[subsector_at]).strip() for row in sorted(rows, key=lambda row: -(row[weight_at] or 0))]
+            for key, rows in snapshot.by_sector.items()
+        }
+        self._names = dict(self.sectors)
+        for alias, sector in SECTOR_ALIASES.items():
+            if normalize_sector(sector) in self.sectors:
+                self._names[alias] = self.sectors[normalize_sector(sector)]
+        self._known = list(self._names)
+        self._tickers = {}
+        self._lock = threading.Lock()
+
+    def resolve_name(self, name):
+        """stockracialharm Sector for a sector name in any spelling, or None."""
+        if not name:
+            return None
+        key = normalize_sector(name)
+        with self._lock:
+            if key in self._names:
+                return self._names[key]
+        close = difflib.get_close_matches(key, self._known, n=1, cutoff=FUZZY_CUTOFF)
+        sector = self._names[close[0]] if close else None
+        with self._lock:
+            self._names[key] = sector
+        return sector
+
+    def subsector(self, sector, industry=None):
+        """The sector's Primary_Subsector closest to ``industry``, else its heaviest one."""
+        subsectors = self.subsectors.get(normalize_sector(sector), [])
+        if len(subsectors) > 1 and industry:
+            by_key = {subsector.lower(): subsector for subsector in subsectors}
+            close = difflib.get_close_matches(industry.lower(), list(by_key), n=1, cutoff=SUBSECTOR_CUTOFF)
+            if close:
+                return by_key[close[0]]
+        return subsectors[0] if subsectors else None
+
+    def resolve(self, sector=None, industry=None):
+        """SectorMatch for a provider sector/industry pair, or None."""
+        if industry and normalize_sector(industry) in INDUSTRY_SECTORS:
+            resolved, source = self.resolve_name(INDUSTRY_SECTORS[normalize_sector(industry)]), f'industry "{industry}"'
+        else:
+            resolved, source = self.resolve_name(sector), f'sector "{sector}"'
+        if resolved is None:
+            return None
+        return SectorMatch(resolved, self.subsector(resolved, industry), source)
+
+    def resolve_ticker(self, ticker, hint=None):
+        """SectorMatch for ``ticker``: ``hint`` (e.g. the workbook's GICS Sector) first, then the provider's info."""
+        ticker = ticker.strip().upper()
+        if hint:
+            match = self.resolve(hint)
+            if match is not None:
+                return match._replace(source=f"GICS {match.source}")
+        with self._lock:
+            if ticker in self._tickers:
+                return self._tickers[ticker]
+        # A failed lookup raises before anything is cached; only real answers are kept
+        info = get_info(ticker)
+        match = self.resolve(info.get("sector"), info.get("industry"))
+        if match is not None:
+            match = match._replace(source=f"provider {match.source}")
+        with self._lock:
+            self._tickers[ticker] = match
+        return match
+
+    def resolve_tickers(self, tickers, hints=None):
+        """Resolve many tickers, running the info lookups concurrently on the batch pool.
+
+        Returns ({ticker: SectorMatch} for those that resolve, {ticker: error
+        message} for failed lookups). Tickers whose info simply has no known
+        sector are in neither.
+        """
+        hints = hints or {}
+        tasks = {ticker: partial(self.resolve_ticker, ticker, hints.get(ticker)) for ticker in dict.fromkeys(tickers)}
+        matches, errors = {}, {}
+        for ticker, match, error in fetch_concurrently(tasks, batch=True):
+            if error is not None:
+                errors[ticker] = str(error)
+            elif match is not None:
+                matches[ticker] = match
+        return matches, errors
+
+    def asyousow_sectors(self, sector):
+        """The As You Sow sector spellings that resolve to the same harm sector as ``sector``."""
+        resolved = self.resolve_name(sector)
+        if resolved is None:
+            return [sector]
+        return [key for key in self.snapshot.asyousow_by_sector if self.resolve_name(key) == resolved]
+
+    def asyousow_frame(self, sector):
+        """As You Sow rows for ``sector`` under every spelling that resolves to it."""
+        return self.snapshot.asyousow_frame(self.asyousow_sectors(sector), harm_sector=self.resolve_name(sector))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index(db_path):
+    """SectorIndex for the current snapshot of ``db_path``; rebuilt when the snapshot reloads."""
+    global _index
+    snapshot = get_snapshot(db_path)
+    with _index_lock:
+        if _index is None or _index.snapshot is not snapshot:
+            _index = SectorIndex(snapshot)
+        return _index
+
+
+def resolve_ticker(ticker, db_path, hint=None):
+    return get_index(db_path).resolve_ticker(ticker, hint)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve tickers or sector names to stockracialharm sectors.")
+    parser.add_argument("db_path")
+    parser.add_argument("names", nargs="+", help="tickers, or sector names in any spelling")
+    args = parser.parse_args()
+
+    index = get_index(args.db_path)
+    for name in args.names:
+        sector = index.resolve_name(name)
+        if sector is not None:
+            print(f"{name}: {sector} / {index.subsector(sector)}")
+            continue
+        try:
+            match = index.resolve_ticker(name)
+        except Exception as e:
+            print(f"{name}: FAILED ({e})")
+            continue
+        print(f"{name}: {match.sector} / {match.subsector} (from {match.source})" if match else f"{name}: not resolved")
+
+
+if __name__ == "__main__":
+    main()
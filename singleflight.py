@@ -0,0 +1,63 @@
+"""In-process single-flight: concurrent calls with the same key share one execution.
+
+The first caller for a key runs the function; anyone asking for the same key
+while it is in flight waits for that result (or exception) instead of making
+their own call. Nothing is cached once the call returns.
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.saved = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Return ``fn(*args, **kwargs)``, sharing the call with any in-flight caller of ``key``.
+
+        Followers receive the leader's result object itself, so treat it as read-only.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.saved += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            return {"executed": self.executed, "saved": self.saved, "in_flight": len(self._calls)}
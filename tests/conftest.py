@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fundamentals_cache  # noqa: E402
+import market_data  # noqa: E402
+import sector_resolver  # noqa: E402
+from compact_series import CompactSeries, SeriesCache  # noqa: E402
+from ingest import ingest  # noqa: E402
+from price_history import PriceHistoryStore  # noqa: E402
+
+
+def make_history(days=300, end="2024-06-28", start_price=100.0, seed=0, dividends=None):
+    """A yfinance-shaped daily history frame: business days up to ``end``."""
+    index = pd.bdate_range(end=end, periods=days, tz="America/New_York", name="Date")
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+    frame = pd.DataFrame({
+        "Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+        "Volume": np.full(days, 1000.0), "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=index)
+    for day, amount in (dividends or {}).items():
+        frame.loc[pd.Timestamp(day, tz=index.tz), "Dividends"] = amount
+    return frame
+
+
+def make_series(closes, end=1_700_000_000, step=86400):
+    """A CompactSeries of daily ``closes`` ending at epoch second ``end``."""
+    closes = np.asarray(closes, dtype=np.float32)
+    ts = np.arange(end - (len(closes) - 1) * step, end + 1, step, dtype=np.int64)
+    return CompactSeries(ts, {"Close": closes})
+
+
+class Fixtures:
+    """Writes recorded responses in ReplayProvider's layout."""
+
+    def __init__(self, root):
+        self.root = str(root)
+        self.replay = market_data.ReplayProvider(self.root)
+
+    def info(self, ticker, **info):
+        path = self.replay._info_path(ticker)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(info, f)
+
+    def history(self, ticker, frame, interval="1d"):
+        path = self.replay._history_path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame.to_parquet(path)
+
+
+@pytest.fixture
+def fixtures(tmp_path, monkeypatch):
+    """Replay provider over a fixture directory in tmp_path, with fresh process-wide caches."""
+    fixtures = Fixtures(tmp_path / "market_data")
+    monkeypatch.setattr(market_data, "_provider", None)
+    monkeypatch.setattr(fundamentals_cache, "_default_cache", None)
+    monkeypatch.setattr(sector_resolver, "_index", None)
+    market_data.set_provider(fixtures.replay)
+    return fixtures
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceHistoryStore(path=str(tmp_path / "prices.db"), memory=SeriesCache())
+
+
+@pytest.fixture(scope="session")
+def db_path(tmp_path_factory):
+    """The dashboard database built from the exports in the repo."""
+    path = str(tmp_path_factory.mktemp("db") / "nycprocurement.db")
+    ingest(path, data_dir=ROOT)
+    return path
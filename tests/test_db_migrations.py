@@ -0,0 +1,31 @@
+import sqlite3
+
+import pytest
+
+from db_migrations import _columns, migrate, normalize_sector, schema_version
+
+
+def test_normalize_sector_matches_the_trigger_key():
+    assert normalize_sector("  Health Care ") == "health care"
+    assert normalize_sector(None) is None
+
+
+def test_failed_migration_rolls_back_its_ddl():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE stockracialharm (Sector TEXT)")
+    conn.execute("INSERT INTO stockracialharm VALUES (' Energy ')")
+    conn.execute("CREATE TABLE asyousowrj (Sector TEXT)")
+    conn.commit()
+
+    # adasina is missing, so migration 1 fails after altering the first two tables
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(conn)
+    assert schema_version(conn) == 0
+    assert "Sector_Key" not in _columns(conn, "stockracialharm")
+
+    conn.execute("CREATE TABLE adasina (Keyword1 TEXT, Keyword2 TEXT, Response TEXT)")
+    conn.execute("CREATE TABLE stockharmdef2 (Key INTEGER)")
+    conn.commit()
+    assert migrate(conn) == 1
+    assert conn.execute("SELECT Sector_Key FROM stockracialharm").fetchall() == [("energy",)]
+    assert conn.isolation_level == ""
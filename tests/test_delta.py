@@ -0,0 +1,24 @@
+from delta import diff, iter_keyed, keyed_rows
+
+
+def test_iter_keyed_drops_duplicates_and_numbers_key_collisions():
+    rows = [
+        ("AAPL", "2024-01-01", "Proposal A", 45.0),
+        ("AAPL", "2024-01-01", "Proposal A", 45.0),
+        ("AAPL", "2024-01-01", "Proposal A", 51.0),
+        ("MSFT", "2024-01-02", "Proposal B", 10.0),
+    ]
+    keys = [key for key, _, _ in iter_keyed(rows, [0, 1, 2])]
+    assert len(keys) == 3
+    assert keys[0].endswith("#0") and keys[1].endswith("#1")
+    assert keys[0].rsplit("#", 1)[0] == keys[1].rsplit("#", 1)[0]
+    # Two passes over the same rows give the same keys
+    assert keys == [key for key, _, _ in iter_keyed(rows, [0, 1, 2])]
+
+
+def test_diff_of_near_identical_exports():
+    old = keyed_rows([("A", 1), ("B", 2), ("C", 3)], [0])
+    new = keyed_rows([("A", 1), ("B", 20), ("D", 4)], [0])
+    delta = diff({k: h for k, (h, _) in old.items()}, {k: h for k, (h, _) in new.items()})
+    assert len(delta.added) == len(delta.removed) == len(delta.changed) == 1
+    assert delta.unchanged == 1
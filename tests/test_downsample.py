@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from downsample import downsample, lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    y = np.zeros(1000)
+    y[437] = 50.0
+    keep = lttb_indices(np.arange(1000), y, 20)
+    assert len(keep) == 20
+    assert keep[0] == 0 and keep[-1] == 999
+    assert 437 in keep
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_returns_everything_below_threshold():
+    np.testing.assert_array_equal(lttb_indices(np.arange(5), np.arange(5), 10), np.arange(5))
+
+
+def test_downsample_datetime_series():
+    index = pd.date_range("2024-01-01", periods=500, freq="h", tz="UTC")
+    series = pd.Series(np.sin(np.arange(500) / 10.0), index=index)
+    short = downsample(series, 100)
+    assert len(short) == 100
+    assert short.index[0] == index[0] and short.index[-1] == index[-1]
+    assert len(downsample(series, 1000)) == 500
@@ -0,0 +1,40 @@
+import threading
+import time
+
+from fetch_pool import active_fetches, fetch_concurrently
+from rate_limit import BATCH, current_priority, request_priority
+
+
+def test_fetch_concurrently_bounds_tasks_in_flight():
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def task(i):
+        def run():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            if i == 3:
+                raise LookupError("no data")
+            return i
+        return run
+
+    results = {name: (result, error) for name, result, error in fetch_concurrently({i: task(i) for i in range(12)}, limit=3)}
+    assert peak[0] <= 3
+    assert set(results) == set(range(12))
+    assert isinstance(results[3][1], LookupError)
+    assert results[5] == (5, None)
+
+
+def test_batch_work_keeps_the_caller_priority_and_is_not_counted():
+    def probe():
+        return current_priority(), active_fetches()
+
+    with request_priority(BATCH):
+        [(_, (priority, active), error)] = list(fetch_concurrently({"probe": probe}, batch=True))
+    assert error is None
+    assert priority == BATCH
+    assert active == 0
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from harm_scoring import quintile_explanation, quintiles, score_sectors
+
+
+def test_quintiles_share_a_bucket_for_ties():
+    np.testing.assert_array_equal(quintiles([1, 1, 1, 50, 100]), [1, 1, 1, 4, 5])
+    np.testing.assert_array_equal(quintiles([np.nan, 10]), [0, 1])
+    np.testing.assert_array_equal(quintiles([60], recorded=[10, 20, 30, 40, 50]), [5])
+
+
+def test_score_sectors_keeps_stored_scores_and_flags_mismatches():
+    rows = pd.DataFrame({
+        "Sector": ["Energy", "Utilities", "Retail"],
+        "Primary_Subsector": ["Oil", "Electric", "Stores"],
+        "Subsector_Weight": [1.0, 0.5, 1.0],
+        "Harm_Magnitude": [3, 2, 2],
+        "Population_Impact": [3, 2, 2],
+        "Directional_Movement": [3, 2, 2],
+        "Total_Score": [9, 6, np.nan],
+        "Normalized_Score_1": [5.0, 2.5, np.nan],
+        "Normalized_Score_2": [100.0, 34.0, np.nan],
+    })
+    scored = score_sectors(rows)
+    assert scored["Normalized_Score_2"].tolist() == [100.0, 34.0, 50.5]
+    assert scored["Score_Mismatch"].tolist() == [False, True, False]
+    assert scored["Derived_Score"].tolist() == [100.0, 50.5, 50.5]
+    assert scored["Weighted_Score"].tolist() == [100.0, 17.0, 50.5]
+    assert scored["Score_Explanation"].iloc[0] == quintile_explanation(scored["Quintile"].iloc[0])
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from conftest import make_series
+from indicators import compute_indicators
+
+
+def test_indicators_do_not_depend_on_the_rest_of_the_batch():
+    rng = np.random.default_rng(1)
+    a = make_series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 600))))
+    # Half-day bars ending three weeks earlier: none of its dates line up with a's
+    b = make_series(np.linspace(50, 60, 300), end=1_700_000_000 - 20 * 86400, step=43200)
+    benchmark = make_series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 700))))
+
+    alone = compute_indicators({"A": a}, benchmark).loc["A"]
+    batched = compute_indicators({"A": a, "B": b}, benchmark).loc["A"]
+    np.testing.assert_allclose(batched.to_numpy(dtype=float), alone.to_numpy(dtype=float), rtol=1e-12)
+
+
+def test_moving_averages_use_the_series_own_last_bars():
+    closes = np.arange(1, 301, dtype=float)
+    row = compute_indicators({"A": make_series(closes)}).loc["A"]
+    assert row["MA 50"] == pytest.approx(closes[-50:].mean())
+    assert row["MA 200"] == pytest.approx(closes[-200:].mean())
+    assert row["Max Drawdown 1Y"] == 0
+    assert np.isnan(row["Beta"])
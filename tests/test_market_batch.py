@@ -0,0 +1,15 @@
+from conftest import make_history
+from market_batch import fetch_batch
+
+
+def test_fetch_batch_normalizes_before_deduplicating(fixtures, store, monkeypatch):
+    fixtures.history("AAPL", make_history(days=30))
+    fixtures.history("MSFT", make_history(days=30, seed=1))
+    reads = []
+    get_full = store.get_full
+    monkeypatch.setattr(store, "get_full", lambda ticker, interval="1d": reads.append(ticker) or get_full(ticker, interval))
+
+    result = fetch_batch(["aapl", " AAPL", "AAPL ", "msft", "", "NOPE"], period="1M", info=False, store=store)
+    assert reads == ["AAPL", "MSFT"]
+    assert list(result.history) == ["AAPL", "MSFT"]
+    assert set(result.errors) == {"NOPE"}
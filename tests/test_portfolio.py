@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+import market_data
+from portfolio import UNMAPPED, aggregate_harm, portfolio_harm
+from rate_limit import BATCH, UpstreamThrottled, current_priority
+from sector_resolver import get_index
+
+SECTOR_TABLE = pd.DataFrame({
+    "Sector": ["Energy", "Utilities"],
+    "Harm_Magnitude": [3.0, 1.0],
+    "Population_Impact": [3.0, 1.0],
+    "Directional_Movement": [3.0, 1.0],
+    "Normalized_Score_2": [100.0, 1.0],
+}, index=pd.Index(["energy", "utilities"]))
+
+
+def test_aggregate_harm_weights_by_value_over_scored_holdings():
+    holdings = [("xom", 10), ("NEE", 10), ("ZZZ", 5)]
+    prices = {"XOM": 10.0, "NEE": 30.0, "ZZZ": 20.0}
+    sectors = {"XOM": "Energy ", "NEE": "utilities"}
+    by_holding, by_sector, total = aggregate_harm(holdings, prices, sectors, SECTOR_TABLE)
+
+    assert by_holding["Sector"].tolist() == ["Energy", "Utilities", UNMAPPED]
+    assert by_sector["Sector"].tolist() == ["Utilities", "Energy", UNMAPPED]
+    assert by_sector["Market_Value"].tolist() == [300.0, 100.0, 100.0]
+    assert total["Market_Value"] == 500.0
+    assert total["Scored_Weight"] == pytest.approx(0.8)
+    # Unmapped value is left out of the average rather than counted as harmless
+    assert total["Normalized_Score_2"] == pytest.approx((100 * 100 + 300 * 1) / 400)
+
+
+class ThrottledInfo:
+    """Replay stand-in whose info() is throttled for some tickers."""
+    name = "throttled"
+
+    def __init__(self, throttled=()):
+        self.throttled = set(throttled)
+        self.calls = []
+
+    def info(self, ticker):
+        self.calls.append((ticker, current_priority()))
+        if ticker in self.throttled:
+            raise UpstreamThrottled(f"{ticker} throttled")
+        return {"ZZOK": {"sector": "Technology"}}.get(ticker, {})
+
+
+def test_resolve_tickers_reports_failures_and_caches_only_answers(fixtures, db_path):
+    provider = ThrottledInfo(throttled={"ZZTHR"})
+    market_data.set_provider(provider)
+    index = get_index(db_path)
+
+    matches, errors = index.resolve_tickers(["ZZOK", "ZZTHR", "ZZNONE"])
+    assert matches["ZZOK"].sector == "Information Technology"
+    assert set(matches) == {"ZZOK"}
+    assert set(errors) == {"ZZTHR"}
+
+    provider.throttled.clear()
+    provider.calls.clear()
+    matches, errors = index.resolve_tickers(["ZZOK", "ZZTHR", "ZZNONE"])
+    assert errors == {}
+    # The failed lookup is retried; the answered ones (including "no sector") are not
+    assert [ticker for ticker, _ in provider.calls] == ["ZZTHR"]
+
+
+def test_portfolio_harm_surfaces_sector_errors_at_batch_priority(fixtures, db_path):
+    provider = ThrottledInfo(throttled={"ZZTHR"})
+    market_data.set_provider(provider)
+    result = portfolio_harm([("ZZOK", 1), ("ZZTHR", 1)], db_path, prices={"ZZOK": 10.0, "ZZTHR": 10.0})
+    assert set(result.errors) == {"ZZTHR"}
+    assert result.total["Scored_Weight"] == pytest.approx(0.5)
+    assert {priority for _, priority in provider.calls} == {BATCH}
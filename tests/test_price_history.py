@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_history
+from price_history import _epoch_seconds, _new_corporate_action, slice_period
+
+
+def test_slice_period_counts_bars_and_calendar_windows():
+    history = make_history(days=300, end="2024-06-28")
+    assert len(slice_period(history, "1D")) == 1
+    assert len(slice_period(history, "5d")) == 5
+    one_month = slice_period(history, "1M")
+    assert one_month.index[0] > history.index[-1] - pd.DateOffset(months=1)
+    assert one_month.index[-1] == history.index[-1]
+    ytd = slice_period(history, "YTD")
+    assert ytd.index[0] == pd.Timestamp("2024-01-01", tz=history.index.tz)
+    assert slice_period(history.iloc[:0], "1Y").empty
+    with pytest.raises(ValueError):
+        slice_period(history, "2W")
+
+
+def test_new_corporate_action_ignores_the_refetched_last_bar():
+    frame = make_history(days=5, end="2024-06-28", dividends={"2024-06-25": 0.5})
+    stamps = _epoch_seconds(frame.index)
+    # The dividend bar is already stored: only later bars count
+    assert not _new_corporate_action(frame, int(stamps[1]))
+    assert _new_corporate_action(frame, int(stamps[0]))
+    assert not _new_corporate_action(frame.iloc[:0], 0)
+    assert not _new_corporate_action(frame.drop(columns=["Dividends", "Stock Splits"]), 0)
+
+
+def test_store_serves_replayed_history(fixtures, store):
+    history = make_history(days=60)
+    fixtures.history("AAPL", history)
+    series = store.get_compact("aapl")
+    assert len(series) == 60
+    np.testing.assert_allclose(series.columns["Close"], history["Close"], rtol=1e-6)
+    assert store.get_compact("AAPL") is series
+
+
+def test_refresh_many_reports_missing_tickers(fixtures, store):
+    fixtures.history("AAPL", make_history(days=10))
+    errors = store.refresh_many(["AAPL", "NOPE"])
+    assert set(errors) == {"NOPE"}
+    assert len(store.get_compact("AAPL")) == 10
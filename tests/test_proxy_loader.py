@@ -0,0 +1,24 @@
+import numpy as np
+
+from proxy_loader import read_workbook
+
+HEADER = "Meeting Date,Company,Symbol,Title,Votes For\n"
+
+
+def _votes(tmp_path, rows):
+    path = tmp_path / "proxy.csv"
+    path.write_text(HEADER + "".join(f"1/{i + 1}/2024,Co{i},C{i},Proposal,{votes}\n" for i, votes in enumerate(rows)))
+    return read_workbook(str(path))["Votes_For"].tolist()
+
+
+def test_bare_fractions_are_rescaled_to_percent(tmp_path):
+    assert _votes(tmp_path, ["0.90", "0.19", "0"]) == [90.0, 19.0, 0.0]
+
+
+def test_bare_percents_and_marked_percents_are_kept(tmp_path):
+    assert _votes(tmp_path, ["45.30", "12.5%", "0"]) == [45.3, 12.5, 0.0]
+
+
+def test_only_zeros_and_ones_are_not_rescaled(tmp_path):
+    assert _votes(tmp_path, ["1", "0", ""])[:2] == [1.0, 0.0]
+    assert np.isnan(_votes(tmp_path, ["1", "0", ""])[2])